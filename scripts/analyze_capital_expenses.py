@@ -3,26 +3,9 @@
 Analyze capital vs operating expenses to understand what constitutes capital spending.
 """
 
-import json
-import pandas as pd
 from collections import defaultdict
 
-def load_raw_data():
-    """Load the raw JSON data"""
-    with open('PublicAccountsPDFs/2024/f4801adb-b00a-4798-9802-005231e275ee (1).json', 'r') as f:
-        data = json.load(f)
-    
-    # Extract field names and records
-    fields = [field['id'] for field in data['fields']]
-    records = data['records']
-    
-    # Create DataFrame
-    df = pd.DataFrame(records, columns=fields)
-    
-    # Convert Amount to numeric
-    df['Amount $'] = pd.to_numeric(df['Amount $'])
-    
-    return df
+from public_accounts_data import load_raw_data
 
 def analyze_capital_expenses(df):
     """Analyze what constitutes capital expenses"""
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Build every Sankey variant from a single aggregation of the cleaned tables.
+
+    python scripts/build_sankey_variants.py              # full, strategic and compact
+    python scripts/build_sankey_variants.py compact      # just the ones named
+
+The expense table is summed once to the finest grain any builder uses
+(ministry / category / program / activity / sub-item / account / details)
+and the full, strategic and compact trees are all derived from that shared
+aggregate, instead of each script re-reading the CSVs and regrouping every
+row. Output files are the same as running transform_sankey_data.py,
+create_strategic_sankey.py and create_compact_sankey.py one after another.
+
+Account classifications are memoized in .sankey_cache/categories.json and
+reused by later runs and other fiscal years. When the cleaner has written
+its source-id sidecar, each build also gets a <name>/lineage.json index
+from nodes to raw record ids (see sankey_lineage.py). Ministry subtrees are cached
+in .sankey_cache/subtrees.json under a fingerprint of each ministry's rows
+(see sankey_incremental.py), so a run after an edit to one ministry only
+regroups that ministry and re-assembles the root totals; --full ignores
+the cache and rebuilds everything.
+
+    python scripts/build_sankey_variants.py compact --top-k 8 --min-share 0.005
+
+caps every node of the written trees at the 8 largest children above 0.5%
+of their parent, folding the rest into "Other" (see sankey_budget.py).
+Budgeted builds are written beside the canonical ones with a _mobile
+suffix (e.g. public/data/sankey_2024_compact_mobile.json), so they never
+replace the files the site loads.
+"""
+
+import argparse
+from functools import partial
+from pathlib import Path
+
+import create_compact_sankey
+import create_strategic_sankey
+import public_accounts_data
+import sankey_budget
+import spending_categories
+import transform_sankey_data
+from create_compact_sankey import (
+    build_compact_ministries,
+    compact_leaf_names,
+    compact_spending_tree,
+    create_compact_revenue,
+)
+from create_strategic_sankey import (
+    build_strategic_ministries,
+    create_strategic_revenue,
+    strategic_leaf_names,
+    strategic_spending_tree,
+)
+from public_accounts_data import (
+    aggregate_expenses,
+    aggregate_revenue,
+    load_expenses,
+    load_revenue,
+    load_source_ids,
+)
+from sankey_budget import BucketPolicy, apply_budget
+from sankey_incremental import SubtreeCache, ministry_fingerprints, source_digest
+from sankey_lineage import lineage_index
+from sankey_output import write_sankey
+from spending_categories import CACHE_PATH, ClassificationCache, use_cache
+from transform_sankey_data import build_ministry_trees, leaf_names, load_revenue_data, spending_tree
+
+# variant -> (output file, ministry subtree builder, spending root builder, revenue builder,
+#             per-row leaf names for lineage)
+VARIANTS = {
+    "full": ("public/data/sankey_2024_fixed.json",
+             build_ministry_trees, spending_tree, load_revenue_data, leaf_names),
+    "strategic": ("public/data/sankey_2024_strategic.json",
+                  build_strategic_ministries, strategic_spending_tree, create_strategic_revenue,
+                  strategic_leaf_names),
+    "compact": ("public/data/sankey_2024_compact.json",
+                build_compact_ministries, compact_spending_tree, create_compact_revenue,
+                compact_leaf_names),
+}
+
+# Modules whose source decides what a cached ministry subtree contains
+SUBTREE_SOURCES = (public_accounts_data, sankey_budget, spending_categories, transform_sankey_data,
+                   create_strategic_sankey, create_compact_sankey)
+BUDGET_SUFFIX = "_mobile"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build Sankey JSON variants from one aggregation.")
+    parser.add_argument("variants", nargs="*", metavar="variant",
+                        help=f"any of {', '.join(VARIANTS)} (default: all)")
+    parser.add_argument("--full", action="store_true",
+                        help="rebuild every ministry subtree instead of reusing cached ones")
+    budget = parser.add_argument_group("node budget", "fold small children into \"Other\" at every level")
+    budget.add_argument("--top-k", type=int, metavar="K", help="keep at most K children per node")
+    budget.add_argument("--min-share", type=float, metavar="F",
+                        help="keep children above this fraction of their parent")
+    budget.add_argument("--min-amount", type=float, metavar="DOLLARS",
+                        help="keep children above this amount")
+    args = parser.parse_args()
+    unknown = set(args.variants) - set(VARIANTS)
+    if unknown:
+        parser.error(f"unknown variant(s): {', '.join(sorted(unknown))}")
+    policy = BucketPolicy(
+        min_amount=round(args.min_amount * 100) if args.min_amount is not None else None,
+        min_share=args.min_share,
+        top_k=args.top_k,
+    )
+
+    categories = ClassificationCache(CACHE_PATH)
+    use_cache(categories)
+    
+    df_expenses = load_expenses()
+    df_revenue = load_revenue()
+    expenses = aggregate_expenses(df_expenses)
+    revenue = aggregate_revenue(df_revenue)
+    print(f"Aggregated {len(df_expenses)} expense rows into {len(expenses)} leaves, "
+          f"{len(df_revenue)} revenue rows into {len(revenue)}")
+
+    # Lineage needs the cleaner's per-row source ids for exactly these rows
+    source, source_ids = load_source_ids() or (None, None)
+    if source_ids is not None and len(source_ids) != len(df_expenses):
+        print("⚠️  clean_expenses lineage sidecar is stale; skipping lineage (re-run the cleaner)")
+        source_ids = None
+
+    subtrees = SubtreeCache(source_digest(*SUBTREE_SOURCES))
+    fingerprints = ministry_fingerprints(expenses)
+
+    for name in args.variants or VARIANTS:
+        output_file, build_ministries, build_spending, build_revenue, build_leaf_names = VARIANTS[name]
+        if args.full:
+            subtrees.variants.pop(name, None)
+        ministries, rebuilt = subtrees.ministries(name, expenses, fingerprints, build_ministries)
+        spending_data, revenue_data = build_spending(ministries), build_revenue(revenue)
+        if policy != BucketPolicy():
+            spending_data = apply_budget(spending_data, policy)
+            revenue_data = apply_budget(revenue_data, policy)
+            path = Path(output_file)
+            output_file = str(path.with_name(f"{path.stem}{BUDGET_SUFFIX}{path.suffix}"))
+        lineage = None
+        if source_ids is not None:
+            rows = build_leaf_names(df_expenses).assign(amount_cents=df_expenses['amount_cents'])
+            lineage = partial(lineage_index, rows=rows, source_ids=source_ids, source=source)
+        document = write_sankey(output_file, spending_data, revenue_data, lineage)
+        print(f"✅ {name}: ${document['spending']:.2f}B spending, "
+              f"${document['revenue']:.2f}B revenue → {output_file} "
+              f"({len(rebuilt)} of {len(fingerprints)} ministries rebuilt)")
+    
+    subtrees.save()
+    categories.save()
+    stats = categories.stats()
+    print(f"Category cache: {stats['hits']} hits, {stats['misses']} misses, "
+          f"{stats['size']} entries ({stats['hit_rate']:.0%} hit rate)")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,20 +2,8 @@
 
 import json
 
-def calculate_ministry_total(ministry_data):
-    """Recursively calculate total amount for a ministry"""
-    total = 0
-    
-    def traverse(node):
-        nonlocal total
-        if 'amount' in node:
-            total += node['amount']
-        if 'children' in node:
-            for child in node['children']:
-                traverse(child)
-    
-    traverse(ministry_data)
-    return total
+from public_accounts_data import cents_to_billions
+from sankey_tree import SankeyNode
 
 def main():
     print("🧮 CALCULATING TRANSPORTATION TOTAL IN SANKEY DATA")
@@ -25,35 +13,28 @@ def main():
         data = json.load(f)
     
     # Find Transportation ministry in spending data
-    spending_data = data['spending_data']
-    transportation_data = None
-    
-    for ministry in spending_data['children']:
-        if ministry['name'] == 'Transportation':
-            transportation_data = ministry
-            break
+    transportation_data = SankeyNode.from_billions(data['spending_data']).child('Transportation')
     
     if transportation_data:
-        total_billions = calculate_ministry_total(transportation_data)
-        total_dollars = total_billions * 1_000_000_000
+        total_cents = transportation_data.subtotal
         
         print(f"💰 Transportation Total in Sankey:")
-        print(f"   Billions: {total_billions:.6f}B")
-        print(f"   Dollars:  ${total_dollars:,.0f}")
+        print(f"   Billions: {cents_to_billions(total_cents):.6f}B")
+        print(f"   Dollars:  ${total_cents / 100:,.2f}")
         
         # Compare with expected
-        expected = 12_073_573_913
-        difference = total_dollars - expected
+        expected = 12_073_573_913 * 100
+        difference = total_cents - expected
         
         print(f"\n📊 Comparison:")
-        print(f"   Expected: ${expected:,.0f}")
-        print(f"   Actual:   ${total_dollars:,.0f}")
-        print(f"   Difference: ${difference:,.0f}")
+        print(f"   Expected: ${expected / 100:,.2f}")
+        print(f"   Actual:   ${total_cents / 100:,.2f}")
+        print(f"   Difference: ${difference / 100:,.2f}")
         
-        if abs(difference) > 1000:  # More than $1000 difference
+        if difference != 0:  # Cents are exact, so any difference is real
             print(f"\n❌ SIGNIFICANT DIFFERENCE FOUND!")
         else:
-            print(f"\n✅ Amounts match closely")
+            print(f"\n✅ Amounts match exactly")
             
     else:
         print("❌ Transportation ministry not found in Sankey data!")
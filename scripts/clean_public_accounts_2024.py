@@ -6,69 +6,598 @@ Clean Ontario Public Accounts revenue and expense data for fiscal year 2024.
 • Expense source: PublicAccountsPDFs/2024/f4801adb-b00a-4798-9802-005231e275ee (1).json
 
 Outputs (overwritten each run):
-  clean_revenue_2024.csv   – columns: revenue_type,revenue_detail,amount_dollars
+  clean_revenue_2024.csv   – columns: revenue_type,revenue_detail,revenue_type_fr,
+                             revenue_detail_fr,amount_dollars
   clean_expenses_2024.csv  – flattened hierarchy with columns described below
+  clean_expenses_2024.totals.json – raw vs emitted control totals (rows, cents)
+                             overall, per ministry and per expenditure category
+  clean_expenses_2024.lineage.json – the source record ``_id`` of every cleaned
+                             row, as run-length [first_row, first_id, length] runs,
+                             and the SHA-256 of the CSV it describes (only when
+                             the dump has an ``_id`` field)
 
 Both outputs live in the same directory as this script (repository root level).
+When pyarrow is installed each CSV also gets a typed Arrow IPC sibling
+(clean_<kind>_<year>.arrow) with dictionary-encoded labels and int64 cents;
+scripts/public_accounts_data.py prefers it over re-parsing the CSV.
+
+Pass --year YYYY (repeatable) or --all-years to clean other fiscal years. Each
+source is read once and rows are routed to clean_<kind>_<year>.csv files in
+that same pass, so the full 2014-15 onwards history costs a single parse.
+
+clean_manifest.json records a content hash for every source and output.
+Sources that have not changed since the last run are skipped, and outputs are
+only replaced when their bytes change, so mtimes stay stable on a no-op run.
+Its "changed" list names the outputs the latest run actually rewrote; pass
+--force to ignore the manifest.
 """
+import argparse
 import csv
-import decimal
+import hashlib
 import json
+import os
+from collections.abc import Iterator
 from pathlib import Path
 
+import interned_table
+from interned_table import InternedTable, StringTable
+
+try:  # columnar output is optional; CSVs are always written
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:
+    pa = None
+
 ROOT = Path(__file__).resolve().parent.parent  # repo root
 REV_PATH = ROOT / "PublicAccountsPDFs/2024/tbs-public-accounts-annual-report-revenue-by-source-2023-24-en-fr.csv"
 EXP_PATH = ROOT / "PublicAccountsPDFs/2024/f4801adb-b00a-4798-9802-005231e275ee (1).json"
 
+DEFAULT_YEAR = 2024  # fiscal year 2023-24
+
 OUT_REV = ROOT / "clean_revenue_2024.csv"
 OUT_EXP = ROOT / "clean_expenses_2024.csv"
 
-def clean_amount(value: str, *, millions: bool) -> decimal.Decimal | None:
-    """Return Decimal dollars (not millions) or None if blank/dash."""
+# Content hashes of every input and output from the last run. Sources whose
+# hash (and the hash of the cleaner's code) is unchanged are skipped entirely.
+MANIFEST_PATH = ROOT / "clean_manifest.json"
+# Modules whose code decides what the outputs contain; editing any of them
+# invalidates every manifest entry.
+CLEANER_MODULES = (Path(__file__), Path(interned_table.__file__))
+
+# Read size for the streaming JSON reader; records are decoded straight out of
+# this window so memory stays flat regardless of how large the dump is.
+READ_CHUNK = 1 << 16
+
+def clean_amount(value: str, *, millions: bool) -> int | None:
+    """Return integer cents (not millions) or None if blank/dash.
+
+    Parsed with plain integer arithmetic: the digits are read as one integer
+    and rescaled, rounding half away from zero below a cent. Exponent form
+    ('1e5', '1.5E3', or a float such as 1e-05) is accepted, as Decimal did.
+    """
     if value is None:
         return None
     txt = str(value).replace(",", "").strip()
     # Handle blanks, em dashes, etc.
     if txt in {"", "-", "–", "—", "- ", " - "}:  # includes nbspace dash
         return None
-    try:
-        amt = decimal.Decimal(txt)
-        if millions:
-            amt *= 1_000_000
-        return amt
-    except decimal.InvalidOperation:
+    sign = -1 if txt[0] == "-" else 1
+    mantissa, e, exponent = txt.lstrip("+-").lower().partition("e")
+    whole, _, frac = mantissa.partition(".")
+    digits = whole + frac
+    if not digits.isdigit() or not digits.isascii():
+        return None
+    power = exponent[1:] if exponent[:1] in ("+", "-") else exponent
+    if e and not (power.isdigit() and power.isascii()):
         return None
+    scale = (int(exponent) if e else 0) - len(frac)
+    num = int(digits) * (100_000_000 if millions else 100) * 10 ** max(scale, 0)
+    den = 10 ** max(-scale, 0)
+    cents, rem = divmod(num, den)
+    if 2 * rem >= den:
+        cents += 1
+    return sign * cents
+
+
+def format_dollars(cents: int) -> str:
+    """Render integer cents as a dollar amount ('1234' or '-12.50')."""
+    whole, part = divmod(abs(cents), 100)
+    sign = "-" if cents < 0 else ""
+    return f"{sign}{whole}" if part == 0 else f"{sign}{whole}.{part:02d}"
+
+class _JSONStream:
+    """Buffered cursor over a JSON text file that decodes one value at a time."""
+
+    def __init__(self, f, chunk_size: int = READ_CHUNK):
+        self._f = f
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
 
-def clean_revenue():
-    rows: list[tuple[str, str, decimal.Decimal]] = []
-    with REV_PATH.open(newline="", encoding="utf-8-sig") as f:
-        reader = csv.DictReader(f)
-        # Identify the amount column (contains 'Amount' in header)
-        amount_col = next((h for h in reader.fieldnames if 'Amount' in h), None)
-        if amount_col is None:
-            raise RuntimeError('Could not locate amount column in revenue CSV.')
+    def _fill(self) -> bool:
+        """Append another chunk to the buffer; return False at end of file."""
+        if self._eof:
+            return False
+        chunk = self._f.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        # Drop everything already consumed before growing the buffer.
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character ('' at end of file)."""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in " \t\r\n":
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        got = self.peek()
+        if got != char:
+            raise ValueError(f"Malformed datastore JSON: expected {char!r}, got {got!r}")
+        self._pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value from the stream."""
+        self.peek()
+        while True:
+            try:
+                val, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A scalar ending exactly at the buffer edge may be truncated.
+            if end == len(self._buf) and self._fill():
+                continue
+            self._pos = end
+            return val
+
+
+def iter_expense_records(path: Path) -> tuple[list[str], Iterator[list]]:
+    """Stream a CKAN datastore dump without loading it whole.
+
+    Returns the field ids from the ``fields`` header and an iterator that
+    yields the ``records`` array one row at a time. ``fields`` must precede
+    ``records`` in the file, which is how the datastore writes its dumps.
+    """
+    f = path.open(encoding="utf-8")
+    stream = _JSONStream(f)
+    stream.expect("{")
+    headers: list[str] | None = None
+    while stream.peek() != "}":
+        key = stream.value()
+        stream.expect(":")
+        if key == "records":
+            if headers is None:
+                f.close()
+                raise ValueError(f"{path.name}: 'records' appears before 'fields'")
+            return headers, _iter_records(stream, f)
+        val = stream.value()
+        if key == "fields":
+            headers = [fld["id"] for fld in val]
+        if stream.peek() == ",":
+            stream.expect(",")
+    f.close()
+    raise ValueError(f"{path.name}: no 'records' array found")
+
+
+def _iter_records(stream: _JSONStream, f) -> Iterator[list]:
+    with f:
+        stream.expect("[")
+        if stream.peek() == "]":
+            return
+        while True:
+            yield stream.value()
+            if stream.peek() == "]":
+                return
+            stream.expect(",")
+
+
+def fiscal_year_end(label: str) -> int | None:
+    """Map a fiscal-year label such as '2023-24' or '23-24' to its end year (2024)."""
+    tail = str(label).strip().rsplit("-", 1)
+    if len(tail) != 2 or len(tail[1]) != 2 or not tail[1].isdigit():
+        return None
+    return 2000 + int(tail[1])
+
+
+def clean_label(value) -> str:
+    """Stripped label text; null and the datastore's "No Value" become ''."""
+    if value is None:
+        return ""
+    value = str(value).strip()
+    return "" if value == "No Value" else value
+
+
+def output_path(kind: str, year: int, suffix: str = ".csv", out_dir: Path = ROOT) -> Path:
+    """Return the cleaned output path for ``kind`` ('revenue'/'expenses') and ``year``."""
+    return out_dir / f"clean_{kind}_{year}{suffix}"
+
+
+def display_path(path: Path) -> str:
+    """Repo-relative path where possible (manifest keys and log lines)."""
+    path = path.resolve()
+    return path.relative_to(ROOT).as_posix() if path.is_relative_to(ROOT) else str(path)
+
+
+class ControlTotals:
+    """Running raw-vs-emitted control totals for one cleaning pass.
+
+    Every source record in a kept year is tallied as ``raw`` (its amount is
+    counted when it parses, otherwise it is a blank) and every written row as
+    ``emitted``, both overall and per label in each of ``dimensions``. The
+    result for a year is a few KB of JSON that reconciliation can read
+    instead of re-parsing the source and the cleaned table.
+    """
+
+    def __init__(self, dimensions: list[str]):
+        self.dimensions = dimensions
+        self.years: dict[int, dict] = {}
+
+    @staticmethod
+    def _bucket() -> dict:
+        return {"raw": {"rows": 0, "blank_amounts": 0, "cents": 0}, "emitted": {"rows": 0, "cents": 0}}
+
+    def add(self, stage: str, year: int, labels: list[str], cents: int | None) -> None:
+        totals = self.years.get(year)
+        if totals is None:
+            totals = self.years[year] = {"overall": self._bucket(), "by": {d: {} for d in self.dimensions}}
+        buckets = [totals["overall"]]
+        for dim, label in zip(self.dimensions, labels):
+            by_label = totals["by"][dim]
+            buckets.append(by_label.get(label) or by_label.setdefault(label, self._bucket()))
+        for bucket in buckets:
+            tally = bucket[stage]
+            tally["rows"] += 1
+            if cents is None:
+                tally["blank_amounts"] += 1
+            else:
+                tally["cents"] += cents
+
+    def to_json(self, year: int, source: Path) -> str:
+        totals = self.years.get(year) or {"overall": self._bucket(), "by": {d: {} for d in self.dimensions}}
+        overall = totals["overall"]
+        payload = {
+            "source": display_path(source),
+            "fiscal_year_end": year,
+            "balanced_cents": overall["raw"]["cents"] == overall["emitted"]["cents"],
+            "overall": overall,
+            "by": {dim: dict(sorted(labels.items())) for dim, labels in totals["by"].items()},
+        }
+        return json.dumps(payload, indent=1, ensure_ascii=False) + "\n"
+
+
+class SourceLineage:
+    """Source record ``_id`` of every row written, per year.
+
+    Cleaned rows keep the dump's order and consecutive records have
+    consecutive ids, so the ids are stored as [first_row, first_id, length]
+    runs: a handful of runs for a whole year unless records are filtered.
+    """
+
+    def __init__(self):
+        self.years: dict[int, list[list[int]]] = {}
+
+    def add(self, year: int, source_id: int) -> None:
+        runs = self.years.setdefault(year, [])
+        if runs and runs[-1][1] + runs[-1][2] == source_id:
+            runs[-1][2] += 1
+        else:
+            start = runs[-1][0] + runs[-1][2] if runs else 0
+            runs.append([start, source_id, 1])
+
+    def to_json(self, year: int, source: Path, table_sha256: str | None) -> str:
+        """``table_sha256`` ties the sidecar to the CSV it was written with."""
+        runs = self.years.get(year, [])
+        payload = {
+            "source": display_path(source),
+            "fiscal_year_end": year,
+            "table_sha256": table_sha256,
+            "rows": runs[-1][0] + runs[-1][2] if runs else 0,
+            "runs": runs,
+        }
+        return json.dumps(payload, separators=(",", ":")) + "\n"
+
+
+def write_arrow(table: InternedTable, path: Path) -> None:
+    """Write an uncompressed Arrow IPC file so readers can memory-map it."""
+    batch = table.to_arrow()
+    with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(sink, batch.schema) as writer:
+        writer.write_table(batch)
+
+
+def sha256_file(path: Path) -> str | None:
+    """Hex SHA-256 of a file's contents, or None if it does not exist."""
+    if not path.exists():
+        return None
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def cleaner_digest() -> str:
+    """Hex SHA-256 over the source of every module in CLEANER_MODULES."""
+    h = hashlib.sha256()
+    for path in CLEANER_MODULES:
+        h.update(path.resolve().read_bytes())
+    return h.hexdigest()
+
+
+def replace_if_changed(tmp: Path, dest: Path) -> bool:
+    """Move ``tmp`` over ``dest`` unless the contents already match.
+
+    Identical outputs are left untouched so their mtimes stay stable for
+    anything downstream that watches them. Returns True if ``dest`` changed.
+    """
+    if sha256_file(tmp) == sha256_file(dest):
+        tmp.unlink()
+        return False
+    os.replace(tmp, dest)
+    return True
+
+
+class BuildManifest:
+    """Content-hash record of the cleaner's inputs and outputs.
+
+    Each source entry stores the source hash, the cleaner_digest() and the year
+    selection it was cleaned with, plus the outputs it produced. A source is
+    fresh when all of those match and every output still hashes to the value
+    recorded for it.
+    """
+
+    def __init__(self, path: Path = MANIFEST_PATH):
+        self.path = path
+        self.data = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+        self.data.setdefault("sources", {})
+        self.data.setdefault("outputs", {})
+        self.data["changed"] = []
+        self.cleaner_sha = cleaner_digest()
+
+    @staticmethod
+    def _key(path: Path) -> str:
+        return display_path(path)
+
+    @staticmethod
+    def _resolve(key: str) -> Path:
+        path = Path(key)
+        return path if path.is_absolute() else ROOT / path
+
+    def outputs_for(self, source: Path) -> list[Path]:
+        """Outputs recorded for ``source`` on its last clean."""
+        entry = self.data["sources"].get(self._key(source), {})
+        return [self._resolve(out) for out in entry.get("outputs", [])]
+
+    @staticmethod
+    def _selection(years: set[int] | None):
+        return "all" if years is None else sorted(years)
+
+    def is_fresh(self, source: Path, years: set[int] | None) -> bool:
+        entry = self.data["sources"].get(self._key(source))
+        if not entry:
+            return False
+        if (entry["sha256"], entry["cleaner_sha256"], entry["years"]) != (
+                sha256_file(source), self.cleaner_sha, self._selection(years)):
+            return False
+        return all(
+            sha256_file(self._resolve(out)) == self.data["outputs"].get(out, {}).get("sha256")
+            for out in entry["outputs"]
+        )
+
+    def record(self, source: Path, years: set[int] | None, outputs: list[Path], changed: list[Path]) -> None:
+        out_keys = [self._key(p) for p in outputs]
+        self.data["sources"][self._key(source)] = {
+            "sha256": sha256_file(source),
+            "cleaner_sha256": self.cleaner_sha,
+            "years": self._selection(years),
+            "outputs": out_keys,
+        }
+        for key, path in zip(out_keys, outputs):
+            self.data["outputs"][key] = {"sha256": sha256_file(path), "source": self._key(source)}
+        self.data["changed"].extend(self._key(p) for p in changed)
+
+    def save(self) -> None:
+        self.path.write_text(json.dumps(self.data, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+class YearPartitionWriter:
+    """Route cleaned rows to one CSV per fiscal year during a single pass.
+
+    Rows carry their amount as integer cents in the last position; the CSV
+    renders it back as ``amount_dollars``. When pyarrow is installed each
+    year's rows are also kept in ``tables`` as an InternedTable whose label
+    codes point into one set of StringTables shared by every year; it backs
+    the Arrow output. Without pyarrow nothing is buffered.
+
+    Files are opened lazily the first time a year is seen; years listed in
+    ``years`` are opened up front so they are (re)written even when empty.
+    ``years=None`` accepts every year found in the source.
+
+    Everything is written to ``*.tmp`` first and only moved into place on a
+    clean exit when the bytes differ from what is already there; ``paths``
+    and ``changed`` list the outputs produced and actually replaced.
+    """
+
+    def __init__(self, kind: str, header: list[str], years: set[int] | None, out_dir: Path = ROOT, *,
+                 source: Path | None = None, totals: ControlTotals | None = None,
+                 lineage: SourceLineage | None = None):
+        self.kind = kind
+        self.source = source
+        self.totals = totals
+        self.lineage = lineage
+        self._totals_idx = [header.index(d) for d in totals.dimensions] if totals else []
+        self.out_dir = out_dir
+        self.header = header
+        self.years = years
+        self.counts: dict[int, int] = {}
+        self._files = {}
+        self._writers = {}
+        # Label tables are shared by every year so each string is stored once.
+        self.string_tables = [StringTable() for _ in header[:-1]]
+        self.tables: dict[int, InternedTable] = {}
+        self.paths: list[Path] = []
+        self.changed: list[Path] = []
+        for year in sorted(years or ()):
+            self._open(year)
+
+    @staticmethod
+    def _tmp(path: Path) -> Path:
+        return path.with_name(path.name + ".tmp")
+
+    def _open(self, year: int):
+        f = self._tmp(output_path(self.kind, year, out_dir=self.out_dir)).open("w", newline="", encoding="utf-8")
+        w = csv.writer(f)
+        w.writerow(self.header)
+        self._files[year] = f
+        self._writers[year] = w
+        self.counts[year] = 0
+        if pa is not None:
+            self.tables[year] = InternedTable(self.header[:-1], self.string_tables)
+        return w
+
+    def accepts(self, year: int | None) -> bool:
+        return year is not None and (self.years is None or year in self.years)
+
+    def record_raw(self, year: int, labels: list[str], cents: int | None) -> None:
+        """Tally a source record for ``year`` in the control totals before filtering."""
+        if year not in self._writers:
+            self._open(year)
+        self.totals.add("raw", year, labels, cents)
+
+    def writerow(self, year: int, row, source_id: int | None = None) -> None:
+        w = self._writers.get(year) or self._open(year)
+        w.writerow([*row[:-1], format_dollars(row[-1])])
+        self.counts[year] += 1
+        if pa is not None:
+            self.tables[year].append(row[:-1], row[-1])
+        if self.totals:
+            self.totals.add("emitted", year, [row[i] for i in self._totals_idx], row[-1])
+        if self.lineage:
+            self.lineage.add(year, source_id)
+
+    def close(self, commit: bool = True) -> None:
+        for f in self._files.values():
+            f.close()
+        if pa is not None and commit:
+            for year, table in self.tables.items():
+                write_arrow(table, self._tmp(output_path(self.kind, year, ".arrow", self.out_dir)))
+        if self.totals and commit:
+            for year in self.counts:
+                tmp = self._tmp(output_path(self.kind, year, ".totals.json", self.out_dir))
+                tmp.write_text(self.totals.to_json(year, self.source), encoding="utf-8")
+        if self.lineage and commit:
+            for year in self.counts:
+                table = sha256_file(self._tmp(output_path(self.kind, year, out_dir=self.out_dir)))
+                tmp = self._tmp(output_path(self.kind, year, ".lineage.json", self.out_dir))
+                tmp.write_text(self.lineage.to_json(year, self.source, table), encoding="utf-8")
+        suffixes = [".csv"]
+        if pa is not None:
+            suffixes.append(".arrow")
+        if self.totals:
+            suffixes.append(".totals.json")
+        if self.lineage:
+            suffixes.append(".lineage.json")
+        for year in sorted(self.counts):
+            for suffix in suffixes:
+                dest = output_path(self.kind, year, suffix, self.out_dir)
+                if not commit:
+                    self._tmp(dest).unlink(missing_ok=True)
+                    continue
+                self.paths.append(dest)
+                if replace_if_changed(self._tmp(dest), dest):
+                    self.changed.append(dest)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        self.close(commit=exc_type is None)
+
+    def report(self, label: str) -> None:
+        for year in sorted(self.counts):
+            path = output_path(self.kind, year, out_dir=self.out_dir)
+            state = "" if path in self.changed else " (unchanged)"
+            print(f"Wrote {self.counts[year]} {label} rows to {display_path(path)}{state}")
+        if pa is None:
+            print("pyarrow not installed; skipped columnar .arrow outputs")
+
+
+# Bilingual revenue CSV columns, resolved to positions once per file.
+REVENUE_COLUMNS = {
+    "year": "Year/Année",
+    "type": "Revenue type",
+    "detail": "Revenue type details",
+    "type_fr": "Type de revenus",
+    "detail_fr": "Détails du type de revenu",
+}
+
+
+def revenue_positions(header: list[str]) -> dict[str, int]:
+    """Map REVENUE_COLUMNS (plus the amount column) to indices in ``header``."""
+    stripped = [h.strip() for h in header]
+    missing = [col for col in REVENUE_COLUMNS.values() if col not in stripped]
+    if missing:
+        raise RuntimeError(f"Revenue CSV is missing columns: {missing}")
+    positions = {key: stripped.index(col) for key, col in REVENUE_COLUMNS.items()}
+    # Identify the amount column (contains 'Amount' in header)
+    amount = next((i for i, h in enumerate(stripped) if "Amount" in h), None)
+    if amount is None:
+        raise RuntimeError('Could not locate amount column in revenue CSV.')
+    positions["amount"] = amount
+    return positions
+
+
+def clean_revenue(years: set[int] | None = frozenset({DEFAULT_YEAR}), *,
+                  source: Path = REV_PATH, out_dir: Path = ROOT) -> YearPartitionWriter:
+    """Clean the bilingual revenue-by-source CSV, keeping English and French labels.
+
+    Columns are read by position and each distinct year label is resolved
+    once, so the per-row work is a dict lookup and four strips.
+    """
+    header = ["revenue_type", "revenue_detail", "revenue_type_fr", "revenue_detail_fr", "amount_dollars"]
+    with source.open(newline="", encoding="utf-8-sig") as f, \
+            YearPartitionWriter("revenue", header, years, out_dir) as out:
+        reader = csv.reader(f)
+        pos = revenue_positions(next(reader))
+        i_year, i_amt = pos["year"], pos["amount"]
+        i_type, i_detail, i_type_fr, i_detail_fr = pos["type"], pos["detail"], pos["type_fr"], pos["detail_fr"]
+        wanted: dict[str, int | None] = {}  # raw year label -> end year, None if filtered out
         for r in reader:
-            fy = r["Year/Année"].strip()
-            if fy not in {"2023-24", "23-24"} and not fy.endswith("23-24"):
-                continue  # skip non-2024 years
-            amt = clean_amount(r[amount_col], millions=True)
+            label = r[i_year]
+            if label not in wanted:
+                year = fiscal_year_end(label)
+                wanted[label] = year if out.accepts(year) else None
+            year = wanted[label]
+            if year is None:
+                continue
+            amt = clean_amount(r[i_amt], millions=True)
             if amt is None:
                 continue
-            rev_type = r["Revenue type"].strip()
-            rev_detail = r["Revenue type details"].strip()
-            rows.append((rev_type, rev_detail, amt))
+            out.writerow(year, (r[i_type].strip(), r[i_detail].strip(),
+                                r[i_type_fr].strip(), r[i_detail_fr].strip(), amt))
+    return out
 
-    # write cleaned CSV
-    with OUT_REV.open("w", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        w.writerow(["revenue_type", "revenue_detail", "amount_dollars"])
-        for row in rows:
-            w.writerow(row)
-    print(f"Wrote {len(rows)} revenue rows to {OUT_REV.relative_to(ROOT)}")
-
-def clean_expenses():
-    data = json.loads(EXP_PATH.read_text(encoding="utf-8"))
-    headers = [fld["id"] for fld in data["fields"]]
+def clean_expenses(years: set[int] | None = frozenset({DEFAULT_YEAR}), *,
+                   source: Path = EXP_PATH, out_dir: Path = ROOT) -> YearPartitionWriter:
+    """Clean one datastore dump; the returned writer's ``tables`` hold the interned rows.
+
+    Control totals by ministry and by expenditure category are kept while
+    streaming and written to clean_expenses_<year>.totals.json. When the
+    dump has an ``_id`` field, each row's source ``_id`` goes to
+    clean_expenses_<year>.lineage.json.
+    """
+    headers, records = iter_expense_records(source)
+    idx_id = headers.index("_id") if "_id" in headers else None
     idx_year = headers.index("Year")
     idx_amt = headers.index("Amount $")
 
@@ -83,35 +612,50 @@ def clean_expenses():
         "Account Details (Expense/Asset Details)",
     ]
     idx_map = {col: headers.index(col) for col in kept_cols}
+    totals = ControlTotals(["Ministry Name", "Expenditure Category (Operating / Capital)"])
+    idx_totals = [kept_cols.index(d) for d in totals.dimensions]
 
-    cleaned_rows: list[list[str | decimal.Decimal]] = []
-    for rec in data["records"]:
-        fy = rec[idx_year]
-        if fy != "2023-24":
-            continue
-        amt = clean_amount(rec[idx_amt], millions=False)
-        if amt is None:
-            continue
-        path_vals = []
-        for col in kept_cols:
-            val = rec[idx_map[col]]
-            if isinstance(val, str):
-                val = val.strip()
-                if val in {"", "No Value"}:
-                    val = ""
-            path_vals.append(val)
-        cleaned_rows.append(path_vals + [amt])
-
-    with OUT_EXP.open("w", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        w.writerow([*kept_cols, "amount_dollars"])
-        w.writerows(cleaned_rows)
-    print(f"Wrote {len(cleaned_rows)} expense rows to {OUT_EXP.relative_to(ROOT)}")
+    # Rows go to the CSVs as they are decoded. With pyarrow installed the writer
+    # also buffers each row's label codes and cents (an InternedTable per year)
+    # for the Arrow output; totals and lineage grow per label and per id run.
+    with YearPartitionWriter("expenses", [*kept_cols, "amount_dollars"], years, out_dir,
+                             source=source, totals=totals,
+                             lineage=SourceLineage() if idx_id is not None else None) as out:
+        for rec in records:
+            year = fiscal_year_end(rec[idx_year])
+            if not out.accepts(year):
+                continue
+            amt = clean_amount(rec[idx_amt], millions=False)
+            path_vals = [clean_label(rec[idx_map[col]]) for col in kept_cols]
+            out.record_raw(year, [path_vals[i] for i in idx_totals], amt)
+            if amt is None:
+                continue
+            out.writerow(year, path_vals + [amt], int(rec[idx_id]) if idx_id is not None else None)
+    return out
 
 
 def main():
-    clean_revenue()
-    clean_expenses()
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--year", type=int, action="append", dest="years",
+                        help=f"fiscal end year to keep (repeatable, default {DEFAULT_YEAR})")
+    parser.add_argument("--all-years", action="store_true",
+                        help="write one cleaned file per fiscal year found in the sources")
+    parser.add_argument("--force", action="store_true",
+                        help=f"re-clean every source even if {MANIFEST_PATH.name} says it is unchanged")
+    args = parser.parse_args()
+    years = None if args.all_years else set(args.years or [DEFAULT_YEAR])
+
+    manifest = BuildManifest()
+    for source, clean, label in ((REV_PATH, clean_revenue, "revenue"), (EXP_PATH, clean_expenses, "expense")):
+        if not args.force and manifest.is_fresh(source, years):
+            print(f"{source.name} unchanged since last run; outputs left untouched")
+            continue
+        out = clean(years)
+        out.report(label)
+        manifest.record(source, years, out.paths, out.changed)
+    manifest.save()
+    if not manifest.data["changed"]:
+        print("No cleaned outputs changed.")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
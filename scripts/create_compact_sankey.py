@@ -5,48 +5,29 @@ unnecessary hierarchy levels. Focus on meaningful government spending patterns.
 """
 
 import pandas as pd
-import json
 import sys
 from typing import Dict, List, Any
 
-# Categories to consolidate into "Operations"
-OPERATIONAL_CATEGORIES = {
-    'Salaries and wages',
-    'Employee benefits', 
-    'Transportation and communication',
-    'Services',
-    'Supplies and equipment',
-    'Recoveries',
-    'Other transactions',
-    'Amortization',
-    'Bad Debt Expense'
-}
+from public_accounts_data import (
+    aggregate_expenses,
+    aggregate_revenue,
+    cents_to_billions,
+    load_expenses,
+    load_revenue,
+)
+from sankey_budget import BucketPolicy, bucket
+from sankey_output import write_sankey
+from sankey_tree import SankeyNode
+from spending_categories import program_category_totals, substantive_categories
 
-def should_consolidate_category(account_name: str, account_details: str) -> bool:
-    """Determine if this should be consolidated into Operations."""
-    
-    # Check if it's in our operational categories
-    for op_cat in OPERATIONAL_CATEGORIES:
-        if op_cat.lower() in account_name.lower():
-            return True
-    
-    # Keep substantive program spending separate
-    if 'transfer payments' in account_name.lower():
-        return False
-        
-    if account_name.lower() in ['capital expense', 'capital']:
-        return False
-        
-    # Check account details for specific programs/grants
-    if pd.notna(account_details) and account_details != '':
-        details_lower = account_details.lower()
-        if any(keyword in details_lower for keyword in [
-            'program', 'grant', 'fund', 'transfer', 'payment', 
-            'subsidy', 'benefit', 'insurance', 'pension'
-        ]):
-            return False
-    
-    return True
+# Substantive spending and revenue sub-items of $1M or less are folded into "Other"
+COMPACT_POLICY = BucketPolicy(min_amount=100_000_000)  # cents
+
+# A ministry whose only program is one of these drops the program level
+ADMIN_PROGRAMS = ['ministry administration', 'administration', 'main program']
+
+# Keeps same-named categories apart, as in build_compact_ministries()
+DETAIL_COLUMNS = ['Expenditure Category (Operating / Capital)', 'Activity / Item', 'Sub Item']
 
 def flatten_single_chains(node: Dict[str, Any]) -> Dict[str, Any]:
     """Recursively flatten chains where a node has only one child."""
@@ -112,53 +93,43 @@ def build_compact_hierarchy(df: pd.DataFrame) -> Dict[str, Any]:
     """Build a compact hierarchy with aggressive flattening."""
     
     print("Building ultra-compact spending hierarchy...")
+    return compact_spending_tree(build_compact_ministries(df))
+
+def compact_spending_tree(ministries: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Root spending node over ministry subtrees, with single-child chains flattened.
+    
+    Flattening rewrites nodes in place, so pass subtrees that are not needed again.
+    """
+    spending_root = {
+        'name': 'Spending',
+        'children': list(ministries.values())
+    }
+    
+    # Apply chain flattening
+    return flatten_single_chains(spending_root)
+
+def build_compact_ministries(df: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+    """One unflattened compact subtree per ministry, keyed by ministry name."""
     
     ministries = {}
     
-    for ministry_name, ministry_group in df.groupby('Ministry Name'):
+    # One groupby does all the summing; the loops below only visit its output
+    # rows, so their cost tracks the number of nodes rather than input rows.
+    # Expenditure category, activity and sub-item are part of the key to avoid
+    # merging distinct spending items (e.g. operating vs capital).
+    totals = program_category_totals(df, DETAIL_COLUMNS)
+    
+    for ministry_name, ministry_group in totals.groupby('Ministry Name'):
         ministry_programs = {}
         
         # Group by program within ministry
         for program_name, program_group in ministry_group.groupby('Program Name', dropna=False):
             
             # Separate operational vs substantive spending
-            operational_total = 0
-            substantive_categories = {}
-            
-            for _, row in program_group.iterrows():
-                account_name = row['Standard Account (Expense/Asset Name)']
-                account_details = row['Account Details (Expense/Asset Details)']
-                expenditure_category = row['Expenditure Category (Operating / Capital)']
-                activity = row['Activity / Item']
-                sub_item = row['Sub Item']
-                amount = float(row['amount_dollars']) / 1e9
-                
-                if should_consolidate_category(account_name, account_details):
-                    operational_total += amount
-                else:
-                    # This is substantive program spending
-                    if 'transfer payments' in account_name.lower() and pd.notna(account_details) and account_details != '':
-                        category_name = account_details
-                    elif pd.notna(account_details) and account_details != '':
-                        category_name = f"{account_name}: {account_details}"
-                    else:
-                        category_name = account_name
-                    
-                    # Create unique key to avoid merging distinct spending items
-                    # Include expenditure category and activity to distinguish operating vs capital
-                    unique_key = f"{category_name}|{expenditure_category}|{activity}|{sub_item}"
-                    
-                    # Aggregate amounts only for truly identical categories
-                    if unique_key in substantive_categories:
-                        substantive_categories[unique_key]['amount'] += amount
-                    else:
-                        substantive_categories[unique_key] = {
-                            'name': category_name,
-                            'amount': amount,
-                            'expenditure_category': expenditure_category,
-                            'activity': activity,
-                            'sub_item': sub_item
-                        }
+            operational = program_group['category'].isna()
+            operational_total = int(program_group.loc[operational, 'amount_cents'].sum())
+            substantive = program_group.loc[~operational]
+            substantive_categories = zip(substantive['category'], substantive['amount_cents'].tolist())
             
             # Clean program name (handle NaN program names)
             if pd.isna(program_name):
@@ -176,32 +147,12 @@ def build_compact_hierarchy(df: pd.DataFrame) -> Dict[str, Any]:
                     'amount': operational_total
                 })
             
-            # Separate substantive spending into major and minor categories
-            major_categories = []
-            minor_categories_total = 0
-            
-            for unique_key, category_data in substantive_categories.items():
-                category_name = category_data['name']
-                amount = category_data['amount']
-                
-                if amount > 0.001:  # $1M threshold
-                    major_categories.append({
-                        'name': f"{ministry_name} → {clean_prog_name} → {category_name}",
-                        'amount': amount
-                    })
-                else:
-                    # Accumulate sub-$1M expenses
-                    minor_categories_total += amount
-            
-            # Add major categories
-            program_items.extend(major_categories)
-            
-            # Add "Other" category for sub-$1M expenses if there are any
-            if minor_categories_total > 0:
-                program_items.append({
-                    'name': f"{ministry_name} → {clean_prog_name} → Other",
-                    'amount': minor_categories_total
-                })
+            # Keep major substantive categories; the rest go under "Other"
+            program_items.extend(bucket(
+                [{'name': f"{ministry_name} → {clean_prog_name} → {category_name}", 'amount': amount}
+                 for category_name, amount in substantive_categories],
+                COMPACT_POLICY, f"{ministry_name} → {clean_prog_name}"
+            ))
             
             # Only keep programs with meaningful spending
             if program_items:
@@ -212,7 +163,7 @@ def build_compact_hierarchy(df: pd.DataFrame) -> Dict[str, Any]:
             program_name, program_items = next(iter(ministry_programs.items()))
             
             # If program name is just administrative, flatten completely
-            if program_name.lower() in ['ministry administration', 'administration', 'main program']:
+            if program_name.lower() in ADMIN_PROGRAMS:
                 ministries[ministry_name] = {
                     'name': ministry_name,
                     'children': [
@@ -247,16 +198,34 @@ def build_compact_hierarchy(df: pd.DataFrame) -> Dict[str, Any]:
                     'children': children
                 }
     
-    # Build the final structure and flatten chains
-    spending_root = {
-        'name': 'Spending',
-        'children': list(ministries.values())
-    }
-    
-    # Apply chain flattening
-    flattened_root = flatten_single_chains(spending_root)
-    
-    return flattened_root
+    return ministries
+
+def compact_leaf_names(df: pd.DataFrame) -> pd.DataFrame:
+    """The compact leaf every row is summed into before "Other" folding.
+
+    Mirrors the naming in build_compact_ministries(), for sankey_lineage:
+    ``parent`` is what a program's "Other" leaf is named after and
+    ``group`` tells apart same-named categories.
+    """
+    ministry = df['Ministry Name']
+    pairs = df[['Ministry Name', 'Program Name']].drop_duplicates()
+    pairs['program'] = [f"{m} (Unspecified Program)" if pd.isna(p) else clean_program_name(m, p)
+                        for m, p in pairs.itertuples(index=False)]
+    program = df[['Ministry Name', 'Program Name']].merge(pairs, how='left')['program'].set_axis(df.index)
+    category = substantive_categories(df)
+    parent = ministry + ' → ' + program
+    leaf = parent + ' → ' + category.fillna('Operations')
+    
+    # Single administrative program: its level is dropped from every name
+    spending = program[df['amount_cents'] != 0]
+    programs = spending.groupby(ministry[spending.index]).unique()
+    flat = ministry.isin([m for m, names in programs.items()
+                          if len(names) == 1 and names[0].lower() in ADMIN_PROGRAMS])
+    for names in (leaf, parent):
+        names[flat] = [name.replace(f" → {p}", "") for name, p in zip(names[flat], program[flat])]
+    
+    details = df[DETAIL_COLUMNS].astype(object).fillna('').agg(' | '.join, axis=1)
+    return pd.DataFrame({'leaf': leaf, 'parent': parent, 'group': details.where(category.notna(), '')})
 
 def create_compact_revenue(df: pd.DataFrame) -> Dict[str, Any]:
     """Create compact revenue with flattening and Other categories for small amounts."""
@@ -264,11 +233,10 @@ def create_compact_revenue(df: pd.DataFrame) -> Dict[str, Any]:
     revenue_types = {}
     
     for revenue_type, type_group in df.groupby('revenue_type'):
-        major_items = []
-        minor_items_total = 0
+        sub_items = []
         
         for revenue_detail, detail_group in type_group.groupby('revenue_detail'):
-            amount = float(detail_group['amount_dollars'].sum()) / 1e9
+            amount = int(detail_group['amount_cents'].sum())
             
             if revenue_detail == revenue_type:
                 # This is the main category amount - always include
@@ -277,21 +245,13 @@ def create_compact_revenue(df: pd.DataFrame) -> Dict[str, Any]:
                     'amount': amount
                 }
             else:
-                # This is a sub-category - apply threshold
-                if amount > 0.001:  # $1M threshold
-                    major_items.append({
-                        'name': f"{revenue_type} → {revenue_detail}",
-                        'amount': amount
-                    })
-                else:
-                    minor_items_total += amount
+                # This is a sub-category - subject to the threshold below
+                sub_items.append({
+                    'name': f"{revenue_type} → {revenue_detail}",
+                    'amount': amount
+                })
         
-        # Add "Other" category for minor revenue items if needed
-        if minor_items_total > 0:
-            major_items.append({
-                'name': f"{revenue_type} → Other",
-                'amount': minor_items_total
-            })
+        major_items = bucket(sub_items, COMPACT_POLICY, revenue_type)
         
         # If we have sub-categories, use those instead
         if major_items:
@@ -312,59 +272,40 @@ def main():
     print("=" * 50)
     
     print("Loading expense data...")
-    df_expenses = pd.read_csv('clean_expenses_2024.csv')
+    df_expenses = load_expenses()
     
     print("Loading revenue data...")
-    df_revenue = pd.read_csv('clean_revenue_2024.csv')
+    df_revenue = load_revenue()
     
     print(f"Input: {len(df_expenses)} expense rows, {len(df_revenue)} revenue rows")
     
+    # Sum to leaf grain once; the builders only ever add within these groups
+    df_expenses = aggregate_expenses(df_expenses)
+    df_revenue = aggregate_revenue(df_revenue)
+    
     # Build compact hierarchies
     spending_data = build_compact_hierarchy(df_expenses)
     revenue_data = create_compact_revenue(df_revenue)
     
-    # Calculate totals
-    def calculate_total(node):
-        if 'amount' in node:
-            return node['amount']
-        elif 'children' in node:
-            return sum(calculate_total(child) for child in node['children'])
-        else:
-            return 0
-    
-    spending_total = calculate_total(spending_data)
-    revenue_total = calculate_total(revenue_data)
+    # Subtotals, leaf counts and sizes in one pass per tree
+    spending = SankeyNode.from_cents(spending_data)
+    revenue = SankeyNode.from_cents(revenue_data)
+    spending_total = spending.subtotal
+    revenue_total = revenue.subtotal
     
     print(f"\n📊 Totals:")
-    print(f"   • Spending: ${spending_total:.2f}B")
-    print(f"   • Revenue: ${revenue_total:.2f}B")
-    
-    # Create final Sankey data structure
-    sankey_data = {
-        'total': max(spending_total, revenue_total),
-        'spending': spending_total,
-        'revenue': revenue_total,
-        'spending_data': spending_data,
-        'revenue_data': revenue_data
-    }
+    print(f"   • Spending: ${cents_to_billions(spending_total):.2f}B")
+    print(f"   • Revenue: ${cents_to_billions(revenue_total):.2f}B")
     
     # Write to file
     output_file = 'public/data/sankey_2024_compact.json'
     print(f"\n💾 Writing compact Sankey data to {output_file}...")
     
-    with open(output_file, 'w') as f:
-        json.dump(sankey_data, f, indent=2)
+    write_sankey(output_file, spending_data, revenue_data)
     
     # Count nodes for comparison
-    def count_nodes(node):
-        count = 1
-        if 'children' in node:
-            for child in node['children']:
-                count += count_nodes(child)
-        return count
-    
-    revenue_nodes = count_nodes(revenue_data)
-    spending_nodes = count_nodes(spending_data)
+    revenue_nodes = revenue.size
+    spending_nodes = spending.size
     
     print("✅ Ultra-compact Sankey transformation complete!")
     print(f"\n📈 Results:")
@@ -10,49 +10,40 @@ This script consolidates:
 """
 
 import pandas as pd
-import json
 import sys
 from typing import Dict, List, Any
 
-# Categories to consolidate into "Operations"
-OPERATIONAL_CATEGORIES = {
-    'Salaries and wages',
-    'Employee benefits', 
-    'Transportation and communication',
-    'Services',
-    'Supplies and equipment',
-    'Recoveries',  # Usually operational adjustments
-    'Other transactions',  # Often administrative
-    'Amortization',
-    'Bad Debt Expense'
-}
+from public_accounts_data import (
+    aggregate_expenses,
+    aggregate_revenue,
+    cents_to_billions,
+    load_expenses,
+    load_revenue,
+)
+from sankey_output import write_sankey
+from sankey_tree import SankeyNode
+from spending_categories import program_category_totals, substantive_categories
 
-def should_consolidate_category(account_name: str, account_details: str) -> bool:
-    """Determine if this should be consolidated into Operations."""
-    
-    # Check if it's in our operational categories
-    for op_cat in OPERATIONAL_CATEGORIES:
-        if op_cat.lower() in account_name.lower():
-            return True
-    
-    # Keep substantive program spending separate
-    if 'transfer payments' in account_name.lower():
-        return False
-        
-    if account_name.lower() in ['capital expense', 'capital']:
-        return False
-        
-    # Check account details for specific programs/grants
-    if pd.notna(account_details) and account_details != '':
-        details_lower = account_details.lower()
-        # These suggest substantive program spending
-        if any(keyword in details_lower for keyword in [
-            'program', 'grant', 'fund', 'transfer', 'payment', 
-            'subsidy', 'benefit', 'insurance', 'pension'
-        ]):
-            return False
-    
-    return True
+def strategic_program_name(ministry: str, program: str) -> str:
+    """Program node name, without redundant ministry name repetition."""
+    if ministry.lower() in program.lower():
+        # Try to extract the unique part
+        program_clean = program.replace(ministry, '').strip()
+        if program_clean and program_clean != 'Program':
+            return f"{ministry} → {program_clean}"
+    return f"{ministry} → {program}"
+
+def strategic_leaf_names(df: pd.DataFrame) -> pd.DataFrame:
+    """The strategic leaf every row is summed into, for sankey_lineage.
+
+    Rows without a program get no leaf, as build_strategic_ministries()
+    leaves them out.
+    """
+    pairs = df[['Ministry Name', 'Program Name']].dropna().drop_duplicates()
+    pairs['program'] = [strategic_program_name(m, p) for m, p in pairs.itertuples(index=False)]
+    program = df[['Ministry Name', 'Program Name']].merge(pairs, how='left')['program'].set_axis(df.index)
+    leaf = program.str.cat(substantive_categories(df).fillna('Operations'), sep=' → ')
+    return pd.DataFrame({'leaf': leaf, 'parent': program, 'group': ''})
 
 def create_strategic_name(row: pd.Series, level: str) -> str:
     """Create strategic names focused on program outcomes."""
@@ -65,13 +56,7 @@ def create_strategic_name(row: pd.Series, level: str) -> str:
         return ministry
     
     if level == 'program':
-        # Clean up program names - remove redundant ministry name repetition
-        if ministry.lower() in program.lower():
-            # Try to extract the unique part
-            program_clean = program.replace(ministry, '').strip()
-            if program_clean and program_clean != 'Program':
-                return f"{ministry} → {program_clean}"
-        return f"{ministry} → {program}"
+        return strategic_program_name(ministry, program)
     
     if level == 'activity' and activity:
         return f"{ministry} → {program} → {activity}"
@@ -82,11 +67,26 @@ def build_strategic_hierarchy(df: pd.DataFrame) -> Dict[str, Any]:
     """Build a strategic hierarchy focused on program outcomes."""
     
     print("Building strategic spending hierarchy...")
+    return strategic_spending_tree(build_strategic_ministries(df))
+
+def strategic_spending_tree(ministries: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Root spending node over ministry subtrees (keyed and ordered by name)."""
+    return {
+        'name': 'Spending',
+        'children': list(ministries.values())
+    }
+
+def build_strategic_ministries(df: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+    """One strategic subtree per ministry with spending, keyed by ministry name."""
+    
+    # Sum every (ministry, program, category) in one groupby; the loops below
+    # only walk its output, so their cost tracks the number of nodes.
+    totals = program_category_totals(df)
     
     # Group by ministry
     ministries = {}
     
-    for ministry_name, ministry_group in df.groupby('Ministry Name'):
+    for ministry_name, ministry_group in totals.groupby('Ministry Name'):
         ministry_node = {
             'name': ministry_name,
             'children': []
@@ -94,53 +94,30 @@ def build_strategic_hierarchy(df: pd.DataFrame) -> Dict[str, Any]:
         
         # Group by program within ministry
         for program_name, program_group in ministry_group.groupby('Program Name'):
+            program_label = strategic_program_name(ministry_name, program_name)
             program_node = {
-                'name': create_strategic_name(program_group.iloc[0], 'program'),
+                'name': program_label,
                 'children': []
             }
             
             # Separate operational vs substantive spending
-            operational_total = 0
-            substantive_categories = {}
-            
-            for _, row in program_group.iterrows():
-                account_name = row['Standard Account (Expense/Asset Name)']
-                account_details = row['Account Details (Expense/Asset Details)']
-                amount = float(row['amount_dollars']) / 1e9
-                
-                if should_consolidate_category(account_name, account_details):
-                    # Add to operational total
-                    operational_total += amount
-                else:
-                    # This is substantive program spending - keep detailed
-                    if 'transfer payments' in account_name.lower() and pd.notna(account_details) and account_details != '':
-                        # Transfer payments - use the program/recipient name
-                        category_name = account_details
-                    elif pd.notna(account_details) and account_details != '':
-                        # Other substantive spending with details
-                        category_name = f"{account_name}: {account_details}"
-                    else:
-                        # Use the account name
-                        category_name = account_name
-                    
-                    # Aggregate amounts for same categories
-                    if category_name in substantive_categories:
-                        substantive_categories[category_name] += amount
-                    else:
-                        substantive_categories[category_name] = amount
+            operational = program_group['category'].isna()
+            operational_total = int(program_group.loc[operational, 'amount_cents'].sum())
+            substantive = program_group.loc[~operational]
+            substantive_categories = zip(substantive['category'], substantive['amount_cents'].tolist())
             
             # Add operational spending as single consolidated category
             if operational_total > 0:
                 program_node['children'].append({
-                    'name': f"{create_strategic_name(program_group.iloc[0], 'program')} → Operations",
+                    'name': f"{program_label} → Operations",
                     'amount': operational_total
                 })
             
             # Add substantive spending categories
-            for category_name, amount in substantive_categories.items():
+            for category_name, amount in substantive_categories:
                 if amount > 0:  # Only include positive amounts
                     program_node['children'].append({
-                        'name': f"{create_strategic_name(program_group.iloc[0], 'program')} → {category_name}",
+                        'name': f"{program_label} → {category_name}",
                         'amount': amount
                     })
             
@@ -152,10 +129,7 @@ def build_strategic_hierarchy(df: pd.DataFrame) -> Dict[str, Any]:
         if ministry_node['children']:
             ministries[ministry_name] = ministry_node
     
-    return {
-        'name': 'Spending',
-        'children': list(ministries.values())
-    }
+    return ministries
 
 def create_strategic_revenue(df: pd.DataFrame) -> Dict[str, Any]:
     """Create strategic revenue categories."""
@@ -173,12 +147,12 @@ def create_strategic_revenue(df: pd.DataFrame) -> Dict[str, Any]:
         for revenue_detail, detail_group in type_group.groupby('revenue_detail'):
             if revenue_detail == revenue_type:
                 # No sub-category, create direct amount node
-                type_node['amount'] = float(detail_group['amount_dollars'].sum()) / 1e9
+                type_node['amount'] = int(detail_group['amount_cents'].sum())
             else:
                 # Has sub-category - use hierarchical naming
                 detail_node = {
                     'name': f"{revenue_type} → {revenue_detail}",
-                    'amount': float(detail_group['amount_dollars'].sum()) / 1e9
+                    'amount': int(detail_group['amount_cents'].sum())
                 }
                 type_node['children'].append(detail_node)
         
@@ -194,59 +168,40 @@ def main():
     print("=" * 50)
     
     print("Loading expense data...")
-    df_expenses = pd.read_csv('clean_expenses_2024.csv')
+    df_expenses = load_expenses()
     
     print("Loading revenue data...")
-    df_revenue = pd.read_csv('clean_revenue_2024.csv')
+    df_revenue = load_revenue()
     
     print(f"Input: {len(df_expenses)} expense rows, {len(df_revenue)} revenue rows")
     
+    # Sum to leaf grain once; the builders only ever add within these groups
+    df_expenses = aggregate_expenses(df_expenses)
+    df_revenue = aggregate_revenue(df_revenue)
+    
     # Build strategic hierarchies
     spending_data = build_strategic_hierarchy(df_expenses)
     revenue_data = create_strategic_revenue(df_revenue)
     
-    # Calculate totals
-    def calculate_total(node):
-        if 'amount' in node:
-            return node['amount']
-        elif 'children' in node:
-            return sum(calculate_total(child) for child in node['children'])
-        else:
-            return 0
-    
-    spending_total = calculate_total(spending_data)
-    revenue_total = calculate_total(revenue_data)
+    # Subtotals, leaf counts and sizes in one pass per tree
+    spending = SankeyNode.from_cents(spending_data)
+    revenue = SankeyNode.from_cents(revenue_data)
+    spending_total = spending.subtotal
+    revenue_total = revenue.subtotal
     
     print(f"\n📊 Totals:")
-    print(f"   • Spending: ${spending_total:.2f}B")
-    print(f"   • Revenue: ${revenue_total:.2f}B")
-    
-    # Create final Sankey data structure
-    sankey_data = {
-        'total': max(spending_total, revenue_total),
-        'spending': spending_total,
-        'revenue': revenue_total,
-        'spending_data': spending_data,
-        'revenue_data': revenue_data
-    }
+    print(f"   • Spending: ${cents_to_billions(spending_total):.2f}B")
+    print(f"   • Revenue: ${cents_to_billions(revenue_total):.2f}B")
     
     # Write to file
     output_file = 'public/data/sankey_2024_strategic.json'
     print(f"\n💾 Writing strategic Sankey data to {output_file}...")
     
-    with open(output_file, 'w') as f:
-        json.dump(sankey_data, f, indent=2)
+    write_sankey(output_file, spending_data, revenue_data)
     
     # Count nodes for comparison
-    def count_nodes(node):
-        count = 1
-        if 'children' in node:
-            for child in node['children']:
-                count += count_nodes(child)
-        return count
-    
-    revenue_nodes = count_nodes(revenue_data)
-    spending_nodes = count_nodes(spending_data)
+    revenue_nodes = revenue.size
+    spending_nodes = spending.size
     
     print("✅ Strategic Sankey transformation complete!")
     print(f"\n📈 Results:")
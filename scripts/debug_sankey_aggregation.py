@@ -7,11 +7,15 @@ We know the input is correct, so the bug is in our processing logic.
 import pandas as pd
 import json
 
+from public_accounts_data import load_expenses
+from spending_categories import operational_mask
+
 def debug_sankey_aggregation():
     print("🐛 DEBUGGING SANKEY AGGREGATION LOGIC")
     print("=" * 60)
     
-    df = pd.read_csv('clean_expenses_2024.csv')
+    df = load_expenses()
+    df['is_operational'] = operational_mask(df)
     
     print(f"Input CSV total: ${df['amount_dollars'].sum():,.0f}")
     print(f"Input CSV records: {len(df)}")
@@ -41,7 +45,7 @@ def debug_sankey_aggregation():
                 
                 total_records_processed += 1
                 
-                if should_consolidate_category(account_name, account_details):
+                if row['is_operational']:
                     operational_total += amount
                 else:
                     # This is substantive program spending
@@ -136,7 +140,7 @@ def find_problematic_records():
     print(f"🔍 FINDING PROBLEMATIC RECORDS")
     print(f"{'='*60}")
     
-    df = pd.read_csv('clean_expenses_2024.csv')
+    df = load_expenses()
     
     # Look for records with unusual characteristics that might cause aggregation issues
     
@@ -167,43 +171,6 @@ def find_problematic_records():
         if pd.notna(details) and details != '':
             print(f"      └─ {details}")
 
-def should_consolidate_category(account_name: str, account_details: str) -> bool:
-    """Same logic as in our compact sankey script"""
-    OPERATIONAL_CATEGORIES = {
-        'Salaries and wages',
-        'Employee benefits', 
-        'Transportation and communication',
-        'Services',
-        'Supplies and equipment',
-        'Recoveries',
-        'Other transactions',
-        'Amortization',
-        'Bad Debt Expense'
-    }
-    
-    # Check if it's in our operational categories
-    for op_cat in OPERATIONAL_CATEGORIES:
-        if op_cat.lower() in account_name.lower():
-            return True
-    
-    # Keep substantive program spending separate
-    if 'transfer payments' in account_name.lower():
-        return False
-        
-    if account_name.lower() in ['capital expense', 'capital']:
-        return False
-        
-    # Check account details for specific programs/grants
-    if pd.notna(account_details) and account_details != '':
-        details_lower = account_details.lower()
-        if any(keyword in details_lower for keyword in [
-            'program', 'grant', 'fund', 'transfer', 'payment', 
-            'subsidy', 'benefit', 'insurance', 'pension'
-        ]):
-            return False
-    
-    return True
-
 def main():
     debug_sankey_aggregation()
     find_problematic_records()
@@ -3,15 +3,19 @@
 import pandas as pd
 import json
 
+from public_accounts_data import load_expenses
+from spending_categories import operational_mask
+
 def debug_transportation_aggregation():
     print("🔬 DETAILED TRANSPORTATION SANKEY AGGREGATION DEBUG")
     print("=" * 80)
     
     # Load raw data
-    df = pd.read_csv('clean_expenses_2024.csv')
+    df = load_expenses()
     
     # Filter Transportation records
     transport_df = df[df['Ministry Name'] == 'Transportation'].copy()
+    transport_df['is_operational'] = operational_mask(transport_df)
     
     print(f"📊 Transportation records: {len(transport_df)}")
     print(f"💰 Raw total: ${transport_df['amount_dollars'].sum():,.0f}")
@@ -42,7 +46,7 @@ def debug_transportation_aggregation():
             program_total += amount
             
             # Check if this should be consolidated as operational
-            should_consolidate = should_consolidate_category(account_name, account_details)
+            should_consolidate = row['is_operational']
             
             if should_consolidate:
                 operational_total += amount
@@ -100,43 +104,5 @@ def debug_transportation_aggregation():
     
     print("\n" + "=" * 80)
 
-def should_consolidate_category(account_name: str, account_details: str) -> bool:
-    """Determine if this should be consolidated into Operations (copied from create_compact_sankey.py)."""
-    
-    OPERATIONAL_CATEGORIES = {
-        'Salaries and wages',
-        'Employee benefits', 
-        'Transportation and communication',
-        'Services',
-        'Supplies and equipment',
-        'Recoveries',
-        'Other transactions',
-        'Amortization',
-        'Bad Debt Expense'
-    }
-    
-    # Check if it's in our operational categories
-    for op_cat in OPERATIONAL_CATEGORIES:
-        if op_cat.lower() in account_name.lower():
-            return True
-    
-    # Keep substantive program spending separate
-    if 'transfer payments' in account_name.lower():
-        return False
-        
-    if account_name.lower() in ['capital expense', 'capital']:
-        return False
-        
-    # Check account details for specific programs/grants
-    if pd.notna(account_details) and account_details != '':
-        details_lower = account_details.lower()
-        if any(keyword in details_lower for keyword in [
-            'program', 'grant', 'fund', 'transfer', 'payment', 
-            'subsidy', 'benefit', 'insurance', 'pension'
-        ]):
-            return False
-    
-    return True
-
 if __name__ == "__main__":
     debug_transportation_aggregation() 
\ No newline at end of file
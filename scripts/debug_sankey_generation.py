@@ -7,9 +7,12 @@ import pandas as pd
 import json
 from collections import defaultdict
 
+from public_accounts_data import load_expenses
+from spending_categories import operational_mask
+
 def load_processed_data():
     """Load our processed data"""
-    return pd.read_csv('clean_expenses_2024.csv')
+    return load_expenses()
 
 def debug_ministry_processing(df, ministry_name):
     """Debug how a specific ministry is processed in our Sankey generation"""
@@ -19,6 +22,7 @@ def debug_ministry_processing(df, ministry_name):
     print(f"{'='*60}")
     
     ministry_data = df[df['Ministry Name'] == ministry_name].copy()
+    ministry_data['is_operational'] = operational_mask(ministry_data)
     
     print(f"📊 RAW MINISTRY DATA:")
     print(f"   Total amount: ${ministry_data['amount_dollars'].sum():,.0f}")
@@ -45,7 +49,7 @@ def debug_ministry_processing(df, ministry_name):
             amount = float(row['amount_dollars']) / 1e9  # Convert to billions like in script
             
             # Apply the same consolidation logic from should_consolidate_category
-            if should_consolidate_category(account_name, account_details):
+            if row['is_operational']:
                 operational_total += amount
             else:
                 # This is substantive program spending
@@ -109,43 +113,6 @@ def debug_ministry_processing(df, ministry_name):
     
     return program_totals
 
-def should_consolidate_category(account_name: str, account_details: str) -> bool:
-    """Same logic as in our compact sankey script"""
-    OPERATIONAL_CATEGORIES = {
-        'Salaries and wages',
-        'Employee benefits', 
-        'Transportation and communication',
-        'Services',
-        'Supplies and equipment',
-        'Recoveries',
-        'Other transactions',
-        'Amortization',
-        'Bad Debt Expense'
-    }
-    
-    # Check if it's in our operational categories
-    for op_cat in OPERATIONAL_CATEGORIES:
-        if op_cat.lower() in account_name.lower():
-            return True
-    
-    # Keep substantive program spending separate
-    if 'transfer payments' in account_name.lower():
-        return False
-        
-    if account_name.lower() in ['capital expense', 'capital']:
-        return False
-        
-    # Check account details for specific programs/grants
-    if pd.notna(account_details) and account_details != '':
-        details_lower = account_details.lower()
-        if any(keyword in details_lower for keyword in [
-            'program', 'grant', 'fund', 'transfer', 'payment', 
-            'subsidy', 'benefit', 'insurance', 'pension'
-        ]):
-            return False
-    
-    return True
-
 def check_data_aggregation_issues(df):
     """Check if there are any data aggregation issues causing double counting"""
     
@@ -1,14 +1,15 @@
 #!/usr/bin/env python3
 
-import pandas as pd
 import json
 
+from public_accounts_data import load_expenses
+
 def debug_transportation_aggregation():
     print("🚀 DEBUGGING TRANSPORTATION AGGREGATION")
     print("=" * 80)
     
     # Load raw data
-    df = pd.read_csv('clean_expenses_2024.csv')
+    df = load_expenses()
     
     # Filter Transportation records
     transport_df = df[df['Ministry Name'] == 'Transportation'].copy()
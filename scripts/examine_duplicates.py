@@ -3,23 +3,17 @@
 Examine the duplicate categories in detail to understand the data structure.
 """
 
-import pandas as pd
-import json
+from public_accounts_data import load_expenses, load_raw_data
 
 def examine_duplicates():
     print("🔍 EXAMINING DUPLICATE CATEGORIES IN DETAIL")
     print("=" * 60)
     
     # Load the processed data
-    df = pd.read_csv('clean_expenses_2024.csv')
+    df = load_expenses()
     
     # Load raw data for comparison
-    with open('PublicAccountsPDFs/2024/f4801adb-b00a-4798-9802-005231e275ee (1).json', 'r') as f:
-        raw_data = json.load(f)
-    
-    fields = [field['id'] for field in raw_data['fields']]
-    raw_df = pd.DataFrame(raw_data['records'], columns=fields)
-    raw_df['Amount $'] = pd.to_numeric(raw_df['Amount $'])
+    raw_df = load_raw_data()
     
     # Focus on the problematic duplicates
     problematic_cases = [
@@ -91,7 +85,7 @@ def examine_health_missing_amount():
     print(f"🔍 SEARCHING FOR HEALTH'S MISSING $734M")
     print(f"{'='*60}")
     
-    df = pd.read_csv('clean_expenses_2024.csv')
+    df = load_expenses()
     
     # Find all Health records
     health_records = df[df['Ministry Name'] == 'Health']
@@ -132,7 +126,7 @@ def check_sankey_aggregation_logic():
     print(f"🔍 CHECKING SANKEY AGGREGATION LOGIC")
     print(f"{'='*60}")
     
-    df = pd.read_csv('clean_expenses_2024.csv')
+    df = load_expenses()
     
     # Test the aggregation logic from our compact sankey script
     total_before_aggregation = df['amount_dollars'].sum()
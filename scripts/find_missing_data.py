@@ -3,14 +3,16 @@
 Find the exact records that are being lost or processed incorrectly.
 """
 
-import pandas as pd
 import json
 
+from public_accounts_data import load_expenses
+from spending_categories import operational_mask
+
 def find_missing_records():
     print("🔍 FINDING MISSING/PROBLEMATIC RECORDS")
     print("=" * 60)
     
-    df = pd.read_csv('clean_expenses_2024.csv')
+    df = load_expenses()
     
     print(f"Total records in CSV: {len(df)}")
     print(f"Total amount in CSV: ${df['amount_dollars'].sum():,.0f}")
@@ -77,18 +79,9 @@ def find_health_discrepancy(df):
         print(f"   ${row['amount_dollars']:,.0f} - {row['Program Name']} - {row['Standard Account (Expense/Asset Name)']} - {row['Account Details (Expense/Asset Details)']}")
     
     # Check if Health has any records that might be classified as operational when they shouldn't be
-    health_operations = 0
-    health_substantive = 0
-    
-    for _, row in health_records.iterrows():
-        account_name = row['Standard Account (Expense/Asset Name)']
-        account_details = row['Account Details (Expense/Asset Details)']
-        amount = row['amount_dollars']
-        
-        if should_consolidate_category(account_name, account_details):
-            health_operations += amount
-        else:
-            health_substantive += amount
+    operational = operational_mask(health_records)
+    health_operations = health_records.loc[operational, 'amount_dollars'].sum()
+    health_substantive = health_records.loc[~operational, 'amount_dollars'].sum()
     
     print(f"\nHealth spending breakdown:")
     print(f"   Operations: ${health_operations:,.0f}")
@@ -116,43 +109,6 @@ def find_transportation_discrepancy(df):
         for _, row in transport_negative.iterrows():
             print(f"   ${row['amount_dollars']:,.0f} - {row['Program Name']} - {row['Standard Account (Expense/Asset Name)']} - {row['Account Details (Expense/Asset Details)']}")
 
-def should_consolidate_category(account_name: str, account_details: str) -> bool:
-    """Same logic as in our compact sankey script"""
-    OPERATIONAL_CATEGORIES = {
-        'Salaries and wages',
-        'Employee benefits', 
-        'Transportation and communication',
-        'Services',
-        'Supplies and equipment',
-        'Recoveries',
-        'Other transactions',
-        'Amortization',
-        'Bad Debt Expense'
-    }
-    
-    # Check if it's in our operational categories
-    for op_cat in OPERATIONAL_CATEGORIES:
-        if op_cat.lower() in account_name.lower():
-            return True
-    
-    # Keep substantive program spending separate
-    if 'transfer payments' in account_name.lower():
-        return False
-        
-    if account_name.lower() in ['capital expense', 'capital']:
-        return False
-        
-    # Check account details for specific programs/grants
-    if pd.notna(account_details) and account_details != '':
-        details_lower = account_details.lower()
-        if any(keyword in details_lower for keyword in [
-            'program', 'grant', 'fund', 'transfer', 'payment', 
-            'subsidy', 'benefit', 'insurance', 'pension'
-        ]):
-            return False
-    
-    return True
-
 def compare_with_sankey_links():
     """Check if the Sankey links add up correctly"""
     
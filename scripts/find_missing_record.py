@@ -6,11 +6,13 @@ We know 1 record out of 2295 is not being processed.
 
 import pandas as pd
 
+from public_accounts_data import load_expenses
+
 def find_missing_record():
     print("🔍 FINDING THE MISSING RECORD")
     print("=" * 60)
     
-    df = pd.read_csv('clean_expenses_2024.csv')
+    df = load_expenses()
     
     print(f"Total records in CSV: {len(df)}")
     print(f"Total amount in CSV: ${df['amount_dollars'].sum():,.0f}")
@@ -113,7 +115,7 @@ def check_groupby_behavior():
     print(f"🔍 CHECKING GROUPBY BEHAVIOR WITH NaN VALUES")
     print(f"{'='*60}")
     
-    df = pd.read_csv('clean_expenses_2024.csv')
+    df = load_expenses()
     
     # Check the default behavior of groupby with NaN
     print(f"Default groupby behavior:")
@@ -4,14 +4,16 @@ Fix negative amount handling and regenerate clean data.
 Negative amounts represent recoveries and should be properly netted.
 """
 
-import pandas as pd
 import json
 
+from public_accounts_data import load_expenses
+from spending_categories import operational_mask
+
 def analyze_negative_amounts():
     print("🔍 ANALYZING NEGATIVE AMOUNTS")
     print("=" * 60)
     
-    df = pd.read_csv('clean_expenses_2024.csv')
+    df = load_expenses()
     
     negative_df = df[df['amount_dollars'] < 0]
     positive_df = df[df['amount_dollars'] >= 0]
@@ -47,7 +49,7 @@ def check_ministry_netting():
     print(f"🔍 CHECKING MINISTRY-LEVEL NETTING")
     print(f"{'='*60}")
     
-    df = pd.read_csv('clean_expenses_2024.csv')
+    df = load_expenses()
     
     # Compare gross vs net totals by ministry
     print(f"{'Ministry':<40} {'Gross':<12} {'Net':<12} {'Difference':<12}")
@@ -68,7 +70,7 @@ def create_fixed_data():
     print(f"🛠️  CREATING FIXED DATA")
     print(f"{'='*60}")
     
-    df = pd.read_csv('clean_expenses_2024.csv')
+    df = load_expenses()
     
     print(f"Original data:")
     print(f"   Total amount: ${df['amount_dollars'].sum():,.0f}")
@@ -98,21 +100,12 @@ def test_sankey_with_negatives():
     print(f"🧪 TESTING SANKEY WITH NEGATIVE HANDLING")
     print(f"{'='*60}")
     
-    df = pd.read_csv('clean_expenses_2024.csv')
+    df = load_expenses()
     
     # Test our consolidation logic with negatives
-    total_operational = 0
-    total_substantive = 0
-    
-    for _, row in df.iterrows():
-        account_name = row['Standard Account (Expense/Asset Name)']
-        account_details = row['Account Details (Expense/Asset Details)']
-        amount = row['amount_dollars']
-        
-        if should_consolidate_category(account_name, account_details):
-            total_operational += amount
-        else:
-            total_substantive += amount
+    operational = operational_mask(df)
+    total_operational = df.loc[operational, 'amount_dollars'].sum()
+    total_substantive = df.loc[~operational, 'amount_dollars'].sum()
     
     print(f"With negative amounts included:")
     print(f"   Operational total: ${total_operational:,.0f}")
@@ -121,43 +114,6 @@ def test_sankey_with_negatives():
     print(f"   Expected total: ${df['amount_dollars'].sum():,.0f}")
     print(f"   Difference: ${df['amount_dollars'].sum() - (total_operational + total_substantive):,.0f}")
 
-def should_consolidate_category(account_name: str, account_details: str) -> bool:
-    """Same logic as in our compact sankey script"""
-    OPERATIONAL_CATEGORIES = {
-        'Salaries and wages',
-        'Employee benefits', 
-        'Transportation and communication',
-        'Services',
-        'Supplies and equipment',
-        'Recoveries',  # This should be operational!
-        'Other transactions',
-        'Amortization',
-        'Bad Debt Expense'
-    }
-    
-    # Check if it's in our operational categories
-    for op_cat in OPERATIONAL_CATEGORIES:
-        if op_cat.lower() in account_name.lower():
-            return True
-    
-    # Keep substantive program spending separate
-    if 'transfer payments' in account_name.lower():
-        return False
-        
-    if account_name.lower() in ['capital expense', 'capital']:
-        return False
-        
-    # Check account details for specific programs/grants
-    if pd.notna(account_details) and account_details != '':
-        details_lower = account_details.lower()
-        if any(keyword in details_lower for keyword in [
-            'program', 'grant', 'fund', 'transfer', 'payment', 
-            'subsidy', 'benefit', 'insurance', 'pension'
-        ]):
-            return False
-    
-    return True
-
 def main():
     analyze_negative_amounts()
     check_ministry_netting()
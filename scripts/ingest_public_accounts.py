@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Clean every Public Accounts source under a directory on a process pool.
+
+    python scripts/ingest_public_accounts.py PublicAccountsPDFs/2024 --all-years
+
+Each file is sniffed (datastore JSON dump -> expenses, bilingual revenue CSV
+-> revenue) and cleaned by clean_public_accounts_2024 in its own worker
+process into a private staging directory under .ingest_cache/. The staged
+per-file outputs are then merged into clean_<kind>_<year>.csv/.arrow in
+sorted source-path order, so the result does not depend on which worker
+finished first. Sources whose content hash is unchanged since the last run
+are not re-cleaned; their staged outputs are reused for the merge.
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import re
+import shutil
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import clean_public_accounts_2024 as cleaner
+from clean_public_accounts_2024 import ROOT, BuildManifest, display_path, replace_if_changed
+
+CACHE_DIR = ROOT / ".ingest_cache"
+STAGED_NAME = re.compile(r"clean_(revenue|expenses)_(\d{4})\.(csv|arrow|totals\.json|lineage\.json)$")
+CLEANERS = {"revenue": cleaner.clean_revenue, "expenses": cleaner.clean_expenses}
+
+
+def detect_kind(path: Path) -> str | None:
+    """Return 'revenue' or 'expenses' for a recognised source file, else None."""
+    suffix = path.suffix.lower()
+    if suffix == ".json":
+        with path.open(encoding="utf-8") as f:
+            head = f.read(4096)
+        return "expenses" if '"fields"' in head else None
+    if suffix == ".csv":
+        with path.open(newline="", encoding="utf-8-sig") as f:
+            header = next(csv.reader(f), [])
+        if "Year/Année" in header and any("Amount" in h for h in header):
+            return "revenue"
+    return None
+
+
+def discover_sources(source_dir: Path) -> list[tuple[str, Path]]:
+    """All recognised sources below ``source_dir``, sorted by path."""
+    found = []
+    for path in sorted(source_dir.rglob("*")):
+        if path.is_file() and CACHE_DIR not in path.parents:
+            kind = detect_kind(path)
+            if kind:
+                found.append((kind, path))
+    return found
+
+
+def staging_dir(source: Path) -> Path:
+    return CACHE_DIR / hashlib.sha1(display_path(source).encode()).hexdigest()[:16]
+
+
+def clean_source(kind: str, source: Path, years: set[int] | None):
+    """Worker: clean one file into its staging directory."""
+    out_dir = staging_dir(source)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    out = CLEANERS[kind](years, source=source, out_dir=out_dir)
+    return kind, source, out.paths, out.changed, out.counts
+
+
+def merge_csv(parts: list[Path], dest: Path) -> bool:
+    tmp = dest.with_name(dest.name + ".tmp")
+    with tmp.open("w", newline="", encoding="utf-8") as out:
+        for i, part in enumerate(parts):
+            with part.open(newline="", encoding="utf-8") as f:
+                header = f.readline()
+                if i == 0:
+                    out.write(header)
+                shutil.copyfileobj(f, out)
+    return replace_if_changed(tmp, dest)
+
+
+def merge_arrow(parts: list[Path], dest: Path) -> bool:
+    pa = cleaner.pa
+    tables = []
+    for part in parts:
+        with pa.memory_map(str(part)) as source:
+            tables.append(pa.ipc.open_file(source).read_all())
+    table = pa.concat_tables(tables).unify_dictionaries().combine_chunks()
+    tmp = dest.with_name(dest.name + ".tmp")
+    with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return replace_if_changed(tmp, dest)
+
+
+def _add_tallies(into: dict, other: dict) -> None:
+    for stage, tally in other.items():
+        for field, value in tally.items():
+            into.setdefault(stage, {}).setdefault(field, 0)
+            into[stage][field] += value
+
+
+def merge_totals(parts: list[Path], dest: Path) -> bool:
+    """Sum per-source control totals sidecars into one."""
+    merged = None
+    for part in parts:
+        data = json.loads(part.read_text(encoding="utf-8"))
+        if merged is None:
+            merged = {**data, "source": [], "by": {dim: {} for dim in data["by"]}}
+            merged["overall"] = {}
+        merged["source"].append(data["source"])
+        _add_tallies(merged["overall"], data["overall"])
+        for dim, labels in data["by"].items():
+            for label, tallies in labels.items():
+                _add_tallies(merged["by"][dim].setdefault(label, {}), tallies)
+    overall = merged["overall"]
+    merged["balanced_cents"] = overall["raw"]["cents"] == overall["emitted"]["cents"]
+    merged["by"] = {dim: dict(sorted(labels.items())) for dim, labels in merged["by"].items()}
+    tmp = dest.with_name(dest.name + ".tmp")
+    tmp.write_text(json.dumps(merged, indent=1, ensure_ascii=False) + "\n", encoding="utf-8")
+    return replace_if_changed(tmp, dest)
+
+
+def merge_lineage(parts: list[Path], dest: Path) -> bool:
+    """Re-tag the lineage of a (kind, year) cleaned from one source with the merged CSV's hash.
+
+    Source ids are only unique within their dump, so merge_outputs() never
+    passes more than one part.
+    """
+    [part] = parts
+    merged = json.loads(part.read_text(encoding="utf-8"))
+    table = dest.with_name(dest.name.replace(".lineage.json", ".csv"))
+    merged["table_sha256"] = cleaner.sha256_file(table)
+    tmp = dest.with_name(dest.name + ".tmp")
+    tmp.write_text(json.dumps(merged, separators=(",", ":")) + "\n", encoding="utf-8")
+    return replace_if_changed(tmp, dest)
+
+
+# Merged in this order per (kind, year): the Arrow copy is written after the
+# CSV so public_accounts_data sees it as fresh (its mtime is not older), and
+# the lineage sidecar records the merged CSV's hash.
+MERGERS = {"csv": merge_csv, "arrow": merge_arrow, "totals.json": merge_totals, "lineage.json": merge_lineage}
+
+
+def merge_outputs(staged: list[Path], out_dir: Path) -> list[Path]:
+    """Concatenate staged per-source outputs into one file per (kind, year, format)."""
+    groups: dict[tuple[str, int, str], list[Path]] = defaultdict(list)
+    for path in staged:
+        m = STAGED_NAME.search(path.name)
+        if m:
+            groups[(m.group(1), int(m.group(2)), m.group(3))].append(path)
+
+    changed = []
+    order = list(MERGERS)
+    for (kind, year, fmt), parts in sorted(groups.items(), key=lambda g: (*g[0][:2], order.index(g[0][2]))):
+        dest = cleaner.output_path(kind, year, f".{fmt}", out_dir)
+        if fmt == "lineage.json" and (len(parts) != 1 or len(groups[(kind, year, "csv")]) != 1):
+            # Some source had no _ids, or the rows come from several dumps whose
+            # _ids overlap, so no sidecar can say which record a row came from
+            print(f"Skipped {display_path(dest)}: lineage needs exactly one source with _ids")
+            dest.unlink(missing_ok=True)
+            continue
+        if MERGERS[fmt](parts, dest):
+            changed.append(dest)
+        elif fmt == "arrow" and cleaner.output_path(kind, year, ".csv", out_dir) in changed:
+            dest.touch()  # same table, but it must not look older than the new CSV
+        state = "" if dest in changed else " (unchanged)"
+        print(f"Merged {len(parts)} source(s) into {display_path(dest)}{state}")
+    return changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Clean a directory of Public Accounts sources in parallel.")
+    parser.add_argument("source_dir", type=Path, nargs="?", default=ROOT / "PublicAccountsPDFs")
+    parser.add_argument("--out-dir", type=Path, default=ROOT)
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="worker processes (default: all cores)")
+    parser.add_argument("--year", type=int, action="append", dest="years",
+                        help=f"fiscal end year to keep (repeatable, default {cleaner.DEFAULT_YEAR})")
+    parser.add_argument("--all-years", action="store_true", help="keep every fiscal year found")
+    parser.add_argument("--force", action="store_true", help="re-clean sources even if unchanged")
+    args = parser.parse_args()
+    years = None if args.all_years else set(args.years or [cleaner.DEFAULT_YEAR])
+
+    sources = discover_sources(args.source_dir.resolve())
+    if not sources:
+        raise SystemExit(f"No recognised sources under {args.source_dir}")
+
+    manifest = BuildManifest(CACHE_DIR / "manifest.json")
+    todo = [(kind, path) for kind, path in sources if args.force or not manifest.is_fresh(path, years)]
+    print(f"Found {len(sources)} source(s); cleaning {len(todo)} on up to {args.jobs} worker(s)")
+
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        futures = [pool.submit(clean_source, kind, path, years) for kind, path in todo]
+        # Collected in submission (sorted path) order to keep the manifest deterministic.
+        for future in futures:
+            kind, source, paths, changed, counts = future.result()
+            manifest.record(source, years, paths, changed)
+            rows = sum(counts.values())
+            print(f"  {kind:<8} {display_path(source)}: {rows} rows, {len(counts)} year(s)")
+    manifest.save()
+
+    staged = [out for _, path in sources for out in manifest.outputs_for(path)]
+    args.out_dir.mkdir(parents=True, exist_ok=True)
+    changed = merge_outputs(staged, args.out_dir)
+    if not changed:
+        print("No merged outputs changed.")
+
+
+if __name__ == "__main__":
+    main()
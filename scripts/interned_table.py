@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Compact, interned in-memory representation of cleaned Public Accounts rows.
+
+Every label column (Ministry Name, Program Name, ...) is stored as an int32
+array of codes into a StringTable shared by all rows - and, when the same
+tables are passed to several InternedTables, by every year cleaned alongside.
+Amounts are an int64 array of cents. A row costs 4 bytes per label column
+plus 8 for the amount instead of a list of Python strings. The cleaner
+buffers each year's rows this way to write its Arrow output.
+"""
+import array
+from collections.abc import Iterable, Sequence
+
+BLANK = -1  # code for an empty label
+
+
+class StringTable:
+    """Bidirectional label <-> code map. Code -1 is the blank label ''."""
+
+    __slots__ = ("codes", "labels")
+
+    def __init__(self, labels: Iterable[str] = ()):
+        self.labels: list[str] = []
+        self.codes: dict[str, int] = {}
+        for label in labels:
+            self.intern(label)
+
+    def intern(self, label: str | None) -> int:
+        if not label:
+            return BLANK
+        code = self.codes.get(label)
+        if code is None:
+            code = self.codes[label] = len(self.labels)
+            self.labels.append(label)
+        return code
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+
+class InternedTable:
+    """Array-backed rows: int32 label codes per column plus int64 cents."""
+
+    def __init__(self, columns: Sequence[str], tables: Sequence[StringTable] | None = None):
+        self.columns = list(columns)
+        self.tables = list(tables) if tables is not None else [StringTable() for _ in self.columns]
+        if len(self.tables) != len(self.columns):
+            raise ValueError("need one StringTable per label column")
+        self.codes = [array.array("i") for _ in self.columns]
+        self.amounts = array.array("q")
+
+    def append(self, labels: Sequence[str], cents: int) -> None:
+        for table, codes, label in zip(self.tables, self.codes, labels):
+            codes.append(table.intern(label))
+        self.amounts.append(cents)
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+    def to_arrow(self, amount_column: str = "amount_cents"):
+        """Arrow table with dictionary-encoded labels holding only the labels used."""
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        null = pa.scalar(None, pa.int32())
+        arrays = []
+        for table, codes in zip(self.tables, self.codes):
+            idx = pa.array(codes, type=pa.int32())
+            idx = pc.if_else(pc.equal(idx, BLANK), null, idx)
+            labels = pa.DictionaryArray.from_arrays(idx, pa.array(table.labels, pa.string()))
+            # Re-encode so shared tables don't leak unused labels into the file.
+            arrays.append(labels.cast(pa.string()).dictionary_encode())
+        arrays.append(pa.array(self.amounts, type=pa.int64()))
+        return pa.table(arrays, names=[*self.columns, amount_column])
@@ -5,45 +5,17 @@ Focus on Health ($73.36B vs $72.63B = $730M difference) and Transportation.
 """
 
 import json
-import pandas as pd
 from collections import defaultdict
 
-def load_raw_data():
-    """Load the raw JSON data"""
-    with open('PublicAccountsPDFs/2024/f4801adb-b00a-4798-9802-005231e275ee (1).json', 'r') as f:
-        data = json.load(f)
-    
-    # Extract field names and records
-    fields = [field['id'] for field in data['fields']]
-    records = data['records']
-    
-    # Create DataFrame
-    df = pd.DataFrame(records, columns=fields)
-    
-    # Convert Amount to numeric
-    df['Amount $'] = pd.to_numeric(df['Amount $'])
-    
-    return df
+from public_accounts_data import load_control_totals, load_expenses, load_raw_data, load_revenue
+from sankey_tree import SankeyNode
 
 def load_processed_data():
     """Load our processed data that we used to create the Sankey"""
-    df_expenses = pd.read_csv('clean_expenses_2024.csv')
-    df_revenue = pd.read_csv('clean_revenue_2024.csv')
+    df_expenses = load_expenses()
+    df_revenue = load_revenue()
     return df_expenses, df_revenue
 
-def sum_ministry_amounts_sankey(ministry_data):
-    """Recursively sum all amounts in a ministry's hierarchy from Sankey data"""
-    total = 0
-    
-    if 'amount' in ministry_data:
-        return ministry_data['amount'] * 1e9  # Convert back to dollars
-    
-    if 'children' in ministry_data:
-        for child in ministry_data['children']:
-            total += sum_ministry_amounts_sankey(child)
-    
-    return total
-
 def load_sankey_data():
     """Load our Sankey data"""
     with open('public/data/sankey_2024_compact.json', 'r') as f:
@@ -65,13 +37,8 @@ def investigate_ministry_discrepancy(ministry_name, raw_df, processed_df, sankey
     processed_total = processed_ministry_data['amount_dollars'].sum()
     
     # Sankey data total for this ministry
-    sankey_ministry = None
-    for ministry in sankey_data['spending_data']['children']:
-        if ministry['name'] == ministry_name:
-            sankey_ministry = ministry
-            break
-    
-    sankey_total = sum_ministry_amounts_sankey(sankey_ministry) if sankey_ministry else 0
+    sankey_ministry = SankeyNode.from_billions(sankey_data['spending_data']).child(ministry_name)
+    sankey_total = sankey_ministry.subtotal / 100 if sankey_ministry else 0  # dollars
     
     print(f"💰 TOTALS:")
     print(f"   Raw data:       ${raw_total:,.0f} (${raw_total/1e9:.3f}B)")
@@ -139,6 +106,34 @@ def investigate_ministry_discrepancy(ministry_name, raw_df, processed_df, sankey
         else:
             print(f"   ❌ MISSING: ${amount/1e6:.1f}M - {program} - {account}")
 
+def report_control_totals(totals):
+    """Pipeline check from the cleaner's control-totals sidecar (no re-parsing)"""
+    overall = totals['overall']
+    raw_total = overall['raw']['cents'] / 100
+    processed_total = overall['emitted']['cents'] / 100
+    
+    print(f"💰 PIPELINE TOTALS (from control totals sidecar):")
+    print(f"   Raw JSON total:     ${raw_total:,.0f} (${raw_total/1e9:.3f}B)")
+    print(f"   Processed CSV total: ${processed_total:,.0f} (${processed_total/1e9:.3f}B)")
+    print(f"   Difference:         ${raw_total - processed_total:,.0f} (${(raw_total - processed_total)/1e6:.1f}M)")
+    
+    print(f"\n📊 RECORD COUNTS:")
+    print(f"   Raw JSON records:     {overall['raw']['rows']}")
+    print(f"   Processed CSV records: {overall['emitted']['rows']}")
+    print(f"   Records lost:         {overall['raw']['rows'] - overall['emitted']['rows']}")
+    print(f"   Blank amounts:        {overall['raw']['blank_amounts']}")
+    
+    for dim, labels in totals['by'].items():
+        unbalanced = {
+            label: t for label, t in labels.items()
+            if t['raw']['cents'] != t['emitted']['cents'] or t['raw']['rows'] != t['emitted']['rows']
+        }
+        if unbalanced:
+            print(f"\n⚠️  {dim} with differences:")
+            for label, t in unbalanced.items():
+                diff = (t['raw']['cents'] - t['emitted']['cents']) / 100
+                print(f"   {label or '(blank)'}: ${diff:,.0f} ({t['raw']['rows'] - t['emitted']['rows']} records)")
+
 def investigate_processing_pipeline():
     """Check if our data processing pipeline is losing data"""
     
@@ -146,6 +141,11 @@ def investigate_processing_pipeline():
     print(f"🔍 INVESTIGATING DATA PROCESSING PIPELINE")
     print(f"{'='*60}")
     
+    totals = load_control_totals()
+    if totals is not None:
+        report_control_totals(totals)
+        return
+    
     # Check if clean_expenses_2024.csv was created from the raw JSON correctly
     raw_df = load_raw_data()
     processed_df, _ = load_processed_data()
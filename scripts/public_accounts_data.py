@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Shared loaders for the cleaned Public Accounts tables.
+
+clean_public_accounts_2024.py writes each cleaned table twice: a CSV (the
+canonical, human-readable copy) and, when pyarrow is available, an Arrow IPC
+file with dictionary-encoded label columns and int64 cents. These helpers
+memory-map the Arrow file when it is at least as new as the CSV and fall back
+to pandas.read_csv otherwise, so every analysis script gets the same frame
+either way.
+
+The raw datastore dump the cleaner reads from is cached the same way:
+load_raw_data() converts it to a memory-mapped Arrow file under .raw_cache/
+on first use, and later calls map only the columns they ask for.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:
+    pa = None
+
+ROOT = Path(__file__).resolve().parent.parent  # repo root
+DEFAULT_YEAR = 2024
+RAW_EXPENSES_PATH = ROOT / "PublicAccountsPDFs/2024/f4801adb-b00a-4798-9802-005231e275ee (1).json"
+RAW_CACHE_DIR = ROOT / ".raw_cache"
+RAW_AMOUNT = "Amount $"
+
+# Amounts are carried as int64 cents from cleaning through aggregation and
+# only turned into (float) billions when a Sankey JSON is serialized.
+CENTS_PER_BILLION = 100 * 1_000_000_000
+
+
+def parse_cents(values: pd.Series) -> pd.Series:
+    """Vectorized dollars -> int64 cents for a column of numbers or numeric text.
+
+    Doubles hold every cent exactly up to ~$90 trillion, so scaling and
+    rounding once is exact for any realistic Public Accounts figure.
+    """
+    if values.dtype == object or pd.api.types.is_string_dtype(values):
+        values = values.astype(str).str.replace(",", "", regex=False).str.strip()
+    dollars = pd.to_numeric(values, errors="coerce")
+    if dollars.isna().any():
+        bad = values[dollars.isna()].iloc[0]
+        raise ValueError(f"Unparseable amount: {bad!r}")
+    return pd.Series(np.rint(dollars.to_numpy(dtype="float64") * 100).astype("int64"), index=values.index)
+
+
+def cents_to_dollars(cents: pd.Series) -> pd.Series:
+    """int64 cents -> dollars; stays int64 when every amount is whole dollars."""
+    if (cents % 100 == 0).all():
+        return cents // 100
+    return cents / 100
+
+
+def cents_to_billions(cents: int) -> float:
+    """Convert an exact cents total to the billions unit used in Sankey JSON."""
+    return int(cents) / CENTS_PER_BILLION
+
+
+def billions_to_cents(billions: float) -> int:
+    """Recover exact cents from a Sankey JSON amount (inverse of cents_to_billions)."""
+    return round(billions * CENTS_PER_BILLION)
+
+
+def load_control_totals(kind: str = "expenses", year: int = DEFAULT_YEAR) -> dict | None:
+    """Raw-vs-emitted control totals the cleaner wrote alongside a table, if any."""
+    path = cleaned_path(kind, year, ".totals.json")
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def load_source_ids(kind: str = "expenses", year: int = DEFAULT_YEAR) -> tuple[Path, np.ndarray] | None:
+    """The source dump and the ``_id`` in it of every cleaned row, from the lineage sidecar.
+
+    None when there is no sidecar or it was written for a different CSV
+    (e.g. one left over after a dump without ``_id``s was cleaned).
+    """
+    path = cleaned_path(kind, year, ".lineage.json")
+    table = cleaned_path(kind, year)
+    if not path.exists() or not table.exists():
+        return None
+    lineage = json.loads(path.read_text(encoding="utf-8"))
+    if lineage.get("table_sha256") != hashlib.sha256(table.read_bytes()).hexdigest():
+        return None
+    ids = np.empty(lineage["rows"], dtype="int64")
+    for first_row, first_id, length in lineage["runs"]:
+        ids[first_row:first_row + length] = np.arange(first_id, first_id + length)
+    return ROOT / lineage["source"], ids
+
+
+def cleaned_path(kind: str, year: int = DEFAULT_YEAR, suffix: str = ".csv") -> Path:
+    """Path of a cleaned table, e.g. cleaned_path('expenses') -> clean_expenses_2024.csv."""
+    return ROOT / f"clean_{kind}_{year}{suffix}"
+
+
+def _arrow_is_fresh(csv_path: Path, arrow_path: Path) -> bool:
+    if pa is None or not arrow_path.exists():
+        return False
+    return not csv_path.exists() or arrow_path.stat().st_mtime >= csv_path.stat().st_mtime
+
+
+def read_arrow(path: Path) -> pd.DataFrame:
+    """Memory-map an Arrow IPC file into a DataFrame.
+
+    Dictionary columns are decoded to plain strings so groupby and
+    comparisons behave exactly as they do on a frame from read_csv.
+    """
+    with pa.memory_map(str(path)) as source:
+        return _arrow_to_frame(pa.ipc.open_file(source).read_all())
+
+
+def _arrow_to_frame(table, *, categorical: bool = False) -> pd.DataFrame:
+    df = table.to_pandas()
+    if not categorical:
+        for col in df.columns:
+            if isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype(df[col].cat.categories.dtype)
+    return df
+
+
+def load_cleaned(kind: str, year: int = DEFAULT_YEAR) -> pd.DataFrame:
+    """Load a cleaned table, preferring the columnar artifact over the CSV.
+
+    The frame always has both ``amount_cents`` (int64, use this for sums) and
+    ``amount_dollars`` (as read_csv would infer it, for display).
+    """
+    csv_path = cleaned_path(kind, year)
+    arrow_path = cleaned_path(kind, year, ".arrow")
+    if _arrow_is_fresh(csv_path, arrow_path):
+        df = read_arrow(arrow_path)
+        df["amount_dollars"] = cents_to_dollars(df["amount_cents"])
+    else:
+        df = pd.read_csv(csv_path, dtype={"amount_dollars": str})
+        df["amount_cents"] = parse_cents(df["amount_dollars"])
+        df["amount_dollars"] = cents_to_dollars(df["amount_cents"])
+    return df
+
+
+def load_expenses(year: int = DEFAULT_YEAR) -> pd.DataFrame:
+    """Cleaned expense rows: seven hierarchy columns plus the amount columns."""
+    return load_cleaned("expenses", year)
+
+
+def load_revenue(year: int = DEFAULT_YEAR) -> pd.DataFrame:
+    """Cleaned revenue rows: revenue_type, revenue_detail plus the amount columns."""
+    return load_cleaned("revenue", year)
+
+
+# Finest grain any Sankey builder groups expenses by. Builders only sum
+# amounts within groups of these columns, so they give the same tree whether
+# they are fed raw rows or rows pre-summed to this grain.
+EXPENSE_GRAIN = [
+    "Ministry Name",
+    "Expenditure Category (Operating / Capital)",
+    "Program Name",
+    "Activity / Item",
+    "Sub Item",
+    "Standard Account (Expense/Asset Name)",
+    "Account Details (Expense/Asset Details)",
+]
+REVENUE_GRAIN = ["revenue_type", "revenue_detail"]
+
+
+def aggregate_cents(df: pd.DataFrame, grain: list[str]) -> pd.DataFrame:
+    """Sum ``amount_cents`` by ``grain`` in one pass.
+
+    Groups keep the order they first appear in ``df`` (and blank labels are
+    kept as their own group), so a builder that lists children in encounter
+    order produces them in the same order from the aggregate.
+    """
+    return (df.groupby(grain, dropna=False, sort=False, observed=True)["amount_cents"]
+              .sum().reset_index())
+
+
+def aggregate_expenses(df: pd.DataFrame) -> pd.DataFrame:
+    return aggregate_cents(df, EXPENSE_GRAIN)
+
+
+def aggregate_revenue(df: pd.DataFrame) -> pd.DataFrame:
+    return aggregate_cents(df, REVENUE_GRAIN)
+
+
+def raw_cache_path(source: Path = RAW_EXPENSES_PATH) -> Path:
+    """Where the columnar copy of a raw datastore dump is cached."""
+    digest = hashlib.sha1(str(source.resolve()).encode()).hexdigest()[:16]
+    return RAW_CACHE_DIR / f"{digest}.arrow"
+
+
+def _source_stamp(source: Path) -> dict[bytes, bytes]:
+    # Size + mtime rather than a content hash: hashing the dump would cost as
+    # much as the parse the cache exists to avoid.
+    st = source.stat()
+    return {b"size": str(st.st_size).encode(), b"mtime_ns": str(st.st_mtime_ns).encode()}
+
+
+def _read_raw_columns(source: Path) -> tuple[list[str], list[list]]:
+    """Stream a datastore dump into per-field lists; amounts become cents."""
+    from clean_public_accounts_2024 import clean_amount, iter_expense_records
+
+    headers, records = iter_expense_records(source)
+    columns: list[list] = [[] for _ in headers]
+    amount = headers.index(RAW_AMOUNT)
+    for record in records:
+        for col, value in zip(columns, record):
+            col.append(value)
+        columns[amount][-1] = clean_amount(record[amount], millions=False)
+    headers[amount] = "amount_cents"
+    return headers, columns
+
+
+def _build_raw_cache(source: Path, dest: Path) -> None:
+    headers, columns = _read_raw_columns(source)
+    arrays = []
+    for name, values in zip(headers, columns):
+        if name in ("_id", "amount_cents"):
+            arrays.append(pa.array(values, pa.int64()))
+        else:
+            arrays.append(pa.array(values, pa.string()).dictionary_encode())
+    table = pa.table(arrays, names=headers).replace_schema_metadata(_source_stamp(source))
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(f"{dest.name}.{os.getpid()}.tmp")
+    with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp, dest)  # atomic, so concurrent readers never see a partial file
+
+
+def open_raw_table(source: Path = RAW_EXPENSES_PATH):
+    """Memory-mapped Arrow table of a raw dump, (re)building the cache if stale.
+
+    Nothing is read until a column is touched, and every process mapping
+    the same cache file shares its pages.
+    """
+    path = raw_cache_path(source)
+    stamp = _source_stamp(source)
+    if path.exists():
+        table = pa.ipc.open_file(pa.memory_map(str(path))).read_all()
+        if (table.schema.metadata or {}) == stamp:
+            return table
+    _build_raw_cache(source, path)
+    return pa.ipc.open_file(pa.memory_map(str(path))).read_all()
+
+
+def load_raw_data(columns: list[str] | None = None, *, source: Path = RAW_EXPENSES_PATH,
+                  categorical: bool = False) -> pd.DataFrame:
+    """Raw datastore records as a DataFrame, via the memory-mapped cache.
+
+    ``Amount $`` is numeric dollars as pd.to_numeric would give it and
+    ``amount_cents`` is the exact int64 amount. Pass ``columns`` to map only
+    the fields an analysis needs.
+    """
+    wanted = None
+    if columns is not None:
+        wanted = ["amount_cents" if c == RAW_AMOUNT else c for c in columns]
+        if "amount_cents" not in wanted:
+            wanted.append("amount_cents")
+    if pa is not None:
+        table = open_raw_table(source)
+        df = _arrow_to_frame(table.select(wanted) if wanted else table, categorical=categorical)
+    else:
+        headers, values = _read_raw_columns(source)
+        df = pd.DataFrame(dict(zip(headers, values)), columns=wanted or headers)
+    if columns is None or RAW_AMOUNT in columns:
+        pos = df.columns.get_loc("amount_cents")
+        df.insert(pos, RAW_AMOUNT, cents_to_dollars(df["amount_cents"]))
+        df["amount_cents"] = df.pop("amount_cents")
+    return df
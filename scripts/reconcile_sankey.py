@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Reconcile raw records, cleaned rows and Sankey leaves at every level.
+
+    python scripts/reconcile_sankey.py                     # full (fixed) tree
+    python scripts/reconcile_sankey.py compact --json report.json
+
+The three layers are reduced to (ministry, program, account) keys named the
+way the full Sankey names its nodes - "Ministry → Program", "Ministry →
+Program → Activity → Account: Details" - stacked, and hash-joined with one
+pivot at the account level. Program, ministry and grand totals are rolled
+up from that one table, so every ministry is checked in the time the old
+per-ministry scripts took to check Health or Transportation.
+
+Every node whose raw, cleaned and Sankey totals are not all equal is
+reported. Amounts are exact cents: the Sankey side is read from the
+columnar file build_sankey_variants.py writes. The strategic and compact
+trees rename and regroup programs and accounts, so for them only the
+ministry and total levels are compared. Exits 1 when anything differs.
+"""
+
+import argparse
+import json
+import sys
+
+import numpy as np
+import pandas as pd
+
+from build_sankey_variants import VARIANTS
+from clean_public_accounts_2024 import fiscal_year_end
+from public_accounts_data import DEFAULT_YEAR, ROOT, load_expenses, load_raw_data
+from sankey_columnar import SEPARATOR, node_names
+from sankey_output import columnar_path
+from transform_sankey_data import hierarchical_names
+
+LAYERS = ['raw', 'cleaned', 'sankey']
+LEVELS = ['ministry', 'program', 'account']
+BLANKS = ['', 'No Value']  # the raw dump spells a missing label "No Value"
+
+KEY_COLUMNS = [
+    'Ministry Name',
+    'Program Name',
+    'Activity / Item',
+    'Sub Item',
+    'Standard Account (Expense/Asset Name)',
+    'Account Details (Expense/Asset Details)',
+]
+
+
+def row_keys(df: pd.DataFrame) -> pd.DataFrame:
+    """Ministry, program and account node names plus cents for every expense row."""
+    # The cleaner strips labels, so the raw side has to as well
+    labels = df[KEY_COLUMNS].astype(object).apply(lambda column: column.str.strip())
+    names = hierarchical_names(labels.mask(labels.isin(BLANKS)))
+    return names.assign(amount_cents=df['amount_cents'])
+
+
+def sankey_keys(doc: dict, full_paths: bool) -> pd.DataFrame:
+    """One row per spending leaf with its ministry (and program) ancestors."""
+    names = node_names(doc)
+    root = doc['roots']['spending_data']
+    path: list[str] = []
+    rows = []
+    for i in range(root, len(names)):
+        depth = doc['depth'][i]
+        if i > root and depth == 0:
+            break  # the revenue tree starts here
+        del path[depth:]
+        path.append(names[i])
+        cents = doc['amount_cents'][i]
+        if cents is not None and depth >= 1:
+            program = path[2] if full_paths and depth >= 3 else ''
+            account = names[i] if full_paths else ''
+            # Chain flattening can rename a ministry node "Ministry → Program"
+            rows.append((path[1].split(SEPARATOR)[0], program, account, cents))
+    return pd.DataFrame(rows, columns=[*LEVELS, 'amount_cents'])
+
+
+def reconcile(variant: str = 'full') -> dict:
+    """Structured report of every level's mismatches for one Sankey variant."""
+    output_file = VARIANTS[variant][0]
+    doc = json.loads(columnar_path(output_file).read_text(encoding='utf-8'))
+    full_paths = variant == 'full'
+    levels = LEVELS if full_paths else LEVELS[:1]
+
+    raw = load_raw_data([*KEY_COLUMNS, 'Year'])
+    # The cleaned and Sankey layers hold one fiscal year; so must the raw one
+    raw = raw[raw['Year'].map(fiscal_year_end) == DEFAULT_YEAR]
+    layers = {
+        'raw': row_keys(raw),
+        'cleaned': row_keys(load_expenses()),
+        'sankey': sankey_keys(doc, full_paths),
+    }
+    stacked = pd.concat([frame.assign(layer=name) for name, frame in layers.items()], ignore_index=True)
+    if not full_paths:
+        stacked[LEVELS[1:]] = ''
+
+    # The single join: every layer's cents side by side per account key
+    leaves = (stacked.pivot_table(index=LEVELS, columns='layer', values='amount_cents',
+                                  aggfunc='sum', fill_value=0)
+                     .reindex(columns=LAYERS, fill_value=0).astype('int64'))
+
+    report = {
+        'variant': variant,
+        'sankey_file': str(columnar_path(output_file).relative_to(ROOT)),
+        'totals': {layer: int(leaves[layer].sum()) for layer in LAYERS},
+        'levels': {},
+    }
+    tables = [('total', leaves.sum().to_frame().T.set_axis(['Total'])),
+              *((level, leaves.groupby(level=LEVELS[:depth + 1]).sum().droplevel(list(range(depth))))
+                for depth, level in enumerate(levels))]
+    for level, table in tables:
+        cents = table[LAYERS].to_numpy()
+        differs = (cents != cents[:, :1]).any(axis=1)
+        mismatches = table[differs]
+        gap = (mismatches['raw'] - mismatches['sankey']).abs().to_numpy()
+        mismatches = mismatches.iloc[np.argsort(-gap, kind='stable')]
+        report['levels'][level] = {
+            'nodes': len(table),
+            'mismatches': [
+                {'key': key, **{f"{layer}_cents": int(row[layer]) for layer in LAYERS},
+                 'raw_minus_cleaned': int(row['raw'] - row['cleaned']),
+                 'cleaned_minus_sankey': int(row['cleaned'] - row['sankey'])}
+                for key, row in mismatches.iterrows()
+            ],
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconcile raw, cleaned and Sankey totals.")
+    parser.add_argument("variant", nargs="?", default="full", choices=list(VARIANTS))
+    parser.add_argument("--json", metavar="PATH", help="also write the full report as JSON")
+    parser.add_argument("--top", type=int, default=10, help="mismatches to print per level")
+    args = parser.parse_args()
+
+    if not columnar_path(VARIANTS[args.variant][0]).exists():
+        print(f"❌ {columnar_path(VARIANTS[args.variant][0]).relative_to(ROOT)} not found; "
+              f"run scripts/build_sankey_variants.py {args.variant} first")
+        sys.exit(1)
+
+    report = reconcile(args.variant)
+    print(f"🔍 RECONCILIATION: raw vs cleaned vs {args.variant} Sankey")
+    print("=" * 60)
+    for layer, cents in report['totals'].items():
+        print(f"   {layer:<8} ${cents / 100:>20,.2f}")
+
+    for level, result in report['levels'].items():
+        mismatches = result['mismatches']
+        status = "✅" if not mismatches else "❌"
+        print(f"\n{status} {level}: {len(mismatches)} of {result['nodes']} nodes differ")
+        for item in mismatches[:args.top]:
+            print(f"   {item['key']}")
+            print(f"      raw→cleaned ${item['raw_minus_cleaned'] / 100:>16,.2f}   "
+                  f"cleaned→sankey ${item['cleaned_minus_sankey'] / 100:>16,.2f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Report written to {args.json}")
+
+    if any(result['mismatches'] for result in report['levels'].values()):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Node-budget policies for Sankey trees: keep the children that matter and
+fold the rest of each node's children into one "<parent> → Other" leaf.
+
+A BucketPolicy combines up to three rules. A child is kept only if it
+passes all of the ones that are set:
+
+    min_amount   its subtotal is above this many cents
+    min_share    its subtotal is above this fraction of its parent's
+    top_k        it is among the k largest children that passed the above
+
+top_k is a partial selection (heapq.nlargest), and kept children stay in
+their original order, so a policy that keeps everything changes nothing.
+With top_k set a node has at most k + 1 children besides pinned ones, which
+bounds the size of the whole tree without tuning thresholds per dataset.
+
+bucket() applies a policy to one list of sibling leaves while a builder is
+assembling them; apply_budget() applies it recursively to every level of
+a finished cents-valued tree.
+"""
+
+import heapq
+from collections.abc import Callable, Sequence
+from typing import NamedTuple
+
+from sankey_tree import SankeyNode
+
+
+class BucketPolicy(NamedTuple):
+    min_amount: int | None = None
+    min_share: float | None = None
+    top_k: int | None = None
+
+    def keep(self, amounts: Sequence[int], parent_total: int) -> list[bool]:
+        """Which of the sibling ``amounts`` survive this policy."""
+        keep = [(self.min_amount is None or amount > self.min_amount) and
+                (self.min_share is None or amount > self.min_share * abs(parent_total))
+                for amount in amounts]
+        if self.top_k is not None and sum(keep) > self.top_k:
+            passed = [i for i, kept in enumerate(keep) if kept]
+            top = set(heapq.nlargest(self.top_k, passed, key=amounts.__getitem__))
+            keep = [i in top for i in range(len(amounts))]
+        return keep
+
+
+def other_node(name: str, folded: int) -> list[dict]:
+    """The "Other" leaf for ``folded`` cents, or nothing when it nets to zero.
+
+    A negative remainder (net recoveries) is kept so subtotals still add up.
+    """
+    return [{'name': f"{name} → Other", 'amount': folded}] if folded != 0 else []
+
+
+def bucket(leaves: list[dict], policy: BucketPolicy, parent_name: str,
+           parent_total: int | None = None) -> list[dict]:
+    """Kept ``leaves`` (dicts with an ``amount``) followed by their Other leaf.
+
+    ``parent_total`` is what min_share is measured against; it defaults to
+    the sum of ``leaves``.
+    """
+    amounts = [leaf['amount'] for leaf in leaves]
+    keep = policy.keep(amounts, sum(amounts) if parent_total is None else parent_total)
+    folded = sum(amount for amount, kept in zip(amounts, keep) if not kept)
+    return [leaf for leaf, kept in zip(leaves, keep) if kept] + other_node(parent_name, folded)
+
+
+def apply_budget(tree: dict, policy: BucketPolicy,
+                 pinned: Callable[[dict], bool] = lambda node: False) -> dict:
+    """Copy of a cents-valued ``tree`` with ``policy`` applied at every level.
+
+    Folded children are replaced by their subtree total, so every ancestor
+    keeps its subtotal. Children for which
+    ``pinned`` is true are always kept and don't count against top_k.
+    """
+    totals = SankeyNode.from_cents(tree)
+    root = {key: value for key, value in tree.items() if key != 'children'}
+    stack = [(tree, totals, root)]
+    while stack:
+        raw, node, out = stack.pop()
+        if 'children' not in raw:
+            continue
+        fixed = [pinned(child) for child in raw['children']]
+        candidates = [i for i, is_pinned in enumerate(fixed) if not is_pinned]
+        verdicts = policy.keep([node.children[i].subtotal for i in candidates], node.subtotal)
+        keep = {i for i, is_pinned in enumerate(fixed) if is_pinned}
+        keep.update(i for i, kept in zip(candidates, verdicts) if kept)
+        children = []
+        for i, child in enumerate(raw['children']):
+            if i in keep:
+                copy = {key: value for key, value in child.items() if key != 'children'}
+                children.append(copy)
+                stack.append((child, node.children[i], copy))
+        folded = sum(node.children[i].subtotal for i in candidates if i not in keep)
+        other = other_node(raw['name'], folded)
+        existing = next((child for child in children
+                         if other and child['name'] == other[0]['name'] and 'children' not in child), None)
+        if existing is not None:
+            # Re-budgeting a tree that already has an Other leaf tops it up
+            existing['amount'] += folded
+            other = []
+        out['children'] = children + other
+    return root
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Columnar encoding of the Sankey trees.
+
+The nested {name, amount, children} JSON repeats every ancestor's name in
+each label ("Ministry → Program → Activity → Account") and costs one object
+per node to parse. The columnar document stores the same trees as flat
+arrays over the nodes in pre-order:
+
+    strings        label segments (the parts between " → "), each once
+    parent         index of the parent node, -1 for a root
+    depth          0 for a root
+    amount_cents   own amount in integer cents, null for nodes without one
+    name_shared    leading segments a node's name shares with its parent's
+    name_offsets   node i's remaining segments are
+    name_segments    name_segments[name_offsets[i]:name_offsets[i + 1]]
+
+Siblings appear in index order and a node's index doubles as its id, so
+every subtree is a contiguous id range. The nested JSON the front end
+reads today is generated from this document by nested_view().
+
+merkle_tree() adds, per node, its subtree size and a hash of its name, own
+amount and its children's hashes. Two builds whose nodes have equal hashes
+have identical subtrees there, so sankey_diff.py only descends where the
+hashes differ. Only the diff needs them, so they are kept in a build-side
+sidecar (see sankey_output.py) rather than in the published document.
+"""
+
+import hashlib
+
+from public_accounts_data import cents_to_billions
+
+FORMAT = "sankey-columnar/1"
+SEPARATOR = " → "
+TREES = ("spending_data", "revenue_data")
+HASH_BYTES = 8  # 64-bit node hashes; plenty to tell two builds' subtrees apart
+
+
+def columnar_document(spending_data: dict, revenue_data: dict) -> dict:
+    """Encode the two cents-valued trees a builder produces."""
+    strings: list[str] = []
+    codes: dict[str, int] = {}
+    parent: list[int] = []
+    depth: list[int] = []
+    amount: list[int | None] = []
+    shared: list[int] = []
+    offsets = [0]
+    segments: list[int] = []
+    roots = {}
+
+    def intern(segment: str) -> int:
+        code = codes.get(segment)
+        if code is None:
+            code = codes[segment] = len(strings)
+            strings.append(segment)
+        return code
+
+    for tree, root in zip(TREES, (spending_data, revenue_data)):
+        roots[tree] = len(parent)
+        # (node, parent index, parent's segments); reversed pushes keep pre-order
+        stack = [(root, -1, [])]
+        while stack:
+            node, up, up_parts = stack.pop()
+            index = len(parent)
+            parts = node['name'].split(SEPARATOR)
+            common = 0
+            for mine, theirs in zip(parts, up_parts):
+                if mine != theirs:
+                    break
+                common += 1
+            parent.append(up)
+            depth.append(depth[up] + 1 if up >= 0 else 0)
+            amount.append(node.get('amount'))
+            shared.append(common)
+            segments.extend(intern(part) for part in parts[common:])
+            offsets.append(len(segments))
+            for child in reversed(node.get('children', [])):
+                stack.append((child, index, parts))
+
+    doc = {
+        'format': FORMAT,
+        'roots': roots,
+        'strings': strings,
+        'parent': parent,
+        'depth': depth,
+        'amount_cents': amount,
+        'name_shared': shared,
+        'name_offsets': offsets,
+        'name_segments': segments,
+    }
+    totals = subtree_cents(doc)
+    spending_total = totals[roots['spending_data']]
+    revenue_total = totals[roots['revenue_data']]
+    return {
+        'format': FORMAT,
+        'total': cents_to_billions(max(spending_total, revenue_total)),
+        'spending': cents_to_billions(spending_total),
+        'revenue': cents_to_billions(revenue_total),
+        **{key: value for key, value in doc.items() if key != 'format'},
+    }
+
+
+def node_names(doc: dict) -> list[str]:
+    """Full display name of every node, rebuilt from the segment columns."""
+    strings, offsets, segments = doc['strings'], doc['name_offsets'], doc['name_segments']
+    parts: list[list[str]] = []
+    for i, (up, common) in enumerate(zip(doc['parent'], doc['name_shared'])):
+        own = [strings[s] for s in segments[offsets[i]:offsets[i + 1]]]
+        parts.append((parts[up][:common] if up >= 0 else []) + own)
+    return [SEPARATOR.join(p) for p in parts]
+
+
+def subtree_cents(doc: dict) -> list[int]:
+    """Total cents under every node (its own amount if it has one)."""
+    totals = [0] * len(doc['parent'])
+    # Children follow their parent in pre-order, so a reverse pass sees every
+    # child before the parent it rolls up into.
+    for i in range(len(totals) - 1, -1, -1):
+        own = doc['amount_cents'][i]
+        if own is not None:
+            totals[i] = own
+        up = doc['parent'][i]
+        if up >= 0 and doc['amount_cents'][up] is None:
+            totals[up] += totals[i]
+    return totals
+
+
+def merkle_tree(doc: dict) -> tuple[list[int], list[str]]:
+    """Subtree size and Merkle hash of every node, in one reverse pass.
+
+    A node's hash covers its full name, its own amount and its children's
+    hashes in order, so any change below a node changes the node's hash.
+    """
+    names = node_names(doc)
+    n = len(names)
+    size = [1] * n
+    hashes = [''] * n
+    # Children's digests, collected last child first by the reverse pass
+    below: list[list[bytes]] = [[] for _ in range(n)]
+    for i in range(n - 1, -1, -1):
+        h = hashlib.sha256(names[i].encode('utf-8'))
+        cents = doc['amount_cents'][i]
+        h.update(b'\0' + (b'' if cents is None else str(cents).encode()) + b'\0')
+        for digest in reversed(below[i]):
+            h.update(digest)
+        digest = h.digest()[:HASH_BYTES]
+        hashes[i] = digest.hex()
+        up = doc['parent'][i]
+        if up >= 0:
+            size[up] += size[i]
+            below[up].append(digest)
+    return size, hashes
+
+
+def subtree_end(doc: dict) -> list[int]:
+    """Exclusive end of every node's pre-order range: its subtree is [i, end[i])."""
+    depth = doc['depth']
+    end = [len(depth)] * len(depth)
+    open_nodes: list[int] = []
+    for i, d in enumerate(depth):
+        while open_nodes and depth[open_nodes[-1]] >= d:
+            end[open_nodes.pop()] = i
+        open_nodes.append(i)
+    return end
+
+
+def nested_nodes(doc: dict, *, ids: bool = False) -> list[dict]:
+    """Linked {name, amount, children} dicts for every node, by index.
+
+    With ``ids`` each node also carries its pre-order index as ``id``.
+    """
+    nodes = []
+    for i, (name, cents) in enumerate(zip(node_names(doc), doc['amount_cents'])):
+        node = {'id': i, 'name': name} if ids else {'name': name}
+        if cents is not None:
+            node['amount'] = cents_to_billions(cents)
+        nodes.append(node)
+    for i, up in enumerate(doc['parent']):
+        if up >= 0:
+            nodes[up].setdefault('children', []).append(nodes[i])
+    return nodes
+
+
+def nested_view(doc: dict) -> dict:
+    """The nested Sankey JSON (amounts in billions) for a columnar document."""
+    nodes = nested_nodes(doc)
+    view = {key: doc[key] for key in ('total', 'spending', 'revenue')}
+    for tree, root in doc['roots'].items():
+        view[tree] = nodes[root]
+    return view
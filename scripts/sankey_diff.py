@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Diff two Sankey builds by their Merkle hashes.
+
+    python scripts/sankey_diff.py OLD.columnar.json NEW.columnar.json
+    python scripts/sankey_diff.py OLD.columnar.json compact    # against the current build
+    python scripts/sankey_diff.py ... --json changes.json
+
+Both sides are columnar documents (see sankey_columnar.py), e.g. two
+nightly content-hashed assets. Their Merkle hashes come from the sidecar
+build_sankey_variants.py leaves in .sankey_cache when it still matches the
+file, and are recomputed from the document otherwise. Starting at the roots, the diff skips every
+subtree whose hash is unchanged and only descends into children whose hash
+differs, matching children by name. Only the names on changed paths are
+decoded, so comparing two builds costs time in proportion to what changed.
+
+Reports leaves whose amount changed and subtrees added or removed, with
+their totals in cents.
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+from public_accounts_data import ROOT
+from sankey_columnar import SEPARATOR, TREES, merkle_tree
+from sankey_output import columnar_path, merkle_path
+
+
+class Build:
+    """A columnar document with its Merkle hashes and lazily decoded node names."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        data = path.read_bytes()
+        self.doc = json.loads(data)
+        # sankey_2024_compact.columnar[.<hash>].json -> .sankey_cache/sankey_2024_compact.merkle.json
+        sidecar = merkle_path(path.name.split('.')[0])
+        merkle = json.loads(sidecar.read_text(encoding='utf-8')) if sidecar.exists() else {}
+        if merkle.get('columnar_sha256') == hashlib.sha256(data).hexdigest():
+            self.size, self.merkle = merkle['subtree_size'], merkle['merkle']
+        else:
+            self.size, self.merkle = merkle_tree(self.doc)
+        self._parts: dict[int, list[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.doc['parent'])
+
+    @property
+    def touched(self) -> int:
+        """Nodes whose names had to be decoded."""
+        return len(self._parts)
+
+    def parts(self, i: int) -> list[str]:
+        parts = self._parts.get(i)
+        if parts is None:
+            doc = self.doc
+            own = [doc['strings'][s] for s in doc['name_segments'][doc['name_offsets'][i]:doc['name_offsets'][i + 1]]]
+            up = doc['parent'][i]
+            parts = self._parts[i] = (self.parts(up)[:doc['name_shared'][i]] if up >= 0 else []) + own
+        return parts
+
+    def name(self, i: int) -> str:
+        return SEPARATOR.join(self.parts(i))
+
+    def children(self, i: int) -> dict[tuple[str, int], int]:
+        """Children of ``i`` keyed by (name, occurrence) so repeated names still pair up."""
+        size = self.size
+        keyed: dict[tuple[str, int], int] = {}
+        seen: dict[str, int] = {}
+        j = i + 1
+        while j < i + size[i]:
+            name = self.name(j)
+            keyed[(name, seen.get(name, 0))] = j
+            seen[name] = seen.get(name, 0) + 1
+            j += size[j]
+        return keyed
+
+    def total(self, i: int) -> int:
+        """Subtree cents; only called on subtrees that were added or removed."""
+        amounts = self.doc['amount_cents'][i:i + self.size[i]]
+        return sum(cents for cents in amounts if cents is not None)
+
+
+def diff_builds(old: Build, new: Build) -> list[dict]:
+    changes = []
+    stack = [(old.doc['roots'][tree], new.doc['roots'][tree]) for tree in reversed(TREES)]
+    while stack:
+        i, j = stack.pop()
+        if old.merkle[i] == new.merkle[j]:
+            continue
+        before, after = old.doc['amount_cents'][i], new.doc['amount_cents'][j]
+        if before != after:
+            changes.append({'change': 'amount', 'name': new.name(j), 'old_cents': before, 'new_cents': after})
+        old_children, new_children = old.children(i), new.children(j)
+        for key, ci in old_children.items():
+            if key not in new_children:
+                changes.append({'change': 'removed', 'name': key[0], 'old_cents': old.total(ci), 'new_cents': None})
+        pairs = []
+        for key, cj in new_children.items():
+            ci = old_children.get(key)
+            if ci is None:
+                changes.append({'change': 'added', 'name': key[0], 'old_cents': None, 'new_cents': new.total(cj)})
+            else:
+                pairs.append((ci, cj))
+        stack.extend(reversed(pairs))
+    return changes
+
+
+def resolve(arg: str) -> Path:
+    """A columnar file path, or a variant name for its current build."""
+    from build_sankey_variants import VARIANTS
+
+    if arg in VARIANTS:
+        return columnar_path(VARIANTS[arg][0])
+    return Path(arg)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Diff two Sankey builds by Merkle hashes.")
+    parser.add_argument("old", help="columnar JSON file or variant name")
+    parser.add_argument("new", help="columnar JSON file or variant name")
+    parser.add_argument("--json", metavar="PATH", help="also write the changes as JSON")
+    parser.add_argument("--top", type=int, default=20, help="changes to print")
+    args = parser.parse_args()
+
+    try:
+        old, new = Build(resolve(args.old)), Build(resolve(args.new))
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    changes = diff_builds(old, new)
+
+    def display(path: Path) -> str:
+        path = path.resolve()
+        return str(path.relative_to(ROOT)) if path.is_relative_to(ROOT) else str(path)
+
+    print(f"🔀 {display(old.path)} → {display(new.path)}")
+    print(f"   Touched {new.touched} of {len(new)} nodes; {len(changes)} changes")
+    for change in changes[:args.top]:
+        before = '—' if change['old_cents'] is None else f"${change['old_cents'] / 100:,.2f}"
+        after = '—' if change['new_cents'] is None else f"${change['new_cents'] / 100:,.2f}"
+        print(f"   {change['change']:<8} {change['name']}: {before} → {after}")
+    if len(changes) > args.top:
+        print(f"   ... and {len(changes) - args.top} more")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(changes, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Changes written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
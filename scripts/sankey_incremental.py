@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Per-ministry incremental rebuilds of the Sankey spending trees.
+
+Every builder produces one subtree per ministry from that ministry's rows
+alone, then puts a root node over them. SubtreeCache keeps each variant's
+ministry subtrees in .sankey_cache/subtrees.json next to a fingerprint of
+the aggregated rows they were built from. On the next run only ministries
+whose fingerprint changed (or that are new) are regrouped; the rest are
+reused and just re-assembled under the root, which is cheap. The cache is
+dropped whenever the builder code changes.
+"""
+
+import copy
+import hashlib
+import json
+import os
+from collections.abc import Callable
+from pathlib import Path
+
+import pandas as pd
+
+from public_accounts_data import ROOT
+
+CACHE_PATH = ROOT / ".sankey_cache" / "subtrees.json"
+
+
+def source_digest(*modules) -> str:
+    """Digest of the source files that decide what a subtree looks like."""
+    h = hashlib.sha256()
+    for module in modules:
+        h.update(Path(module.__file__).read_bytes())
+    return h.hexdigest()[:16]
+
+
+def ministry_fingerprints(expenses: pd.DataFrame) -> dict[str, str]:
+    """Order-sensitive digest of each ministry's rows, in one vectorized hash pass."""
+    row_hashes = pd.util.hash_pandas_object(expenses, index=False).to_numpy()
+    groups = expenses.groupby('Ministry Name', sort=False).indices
+    return {name: hashlib.sha256(row_hashes[rows].tobytes()).hexdigest()[:16]
+            for name, rows in groups.items()}
+
+
+class SubtreeCache:
+    """Ministry subtrees per variant, keyed by the fingerprint of their rows."""
+
+    def __init__(self, code: str, path: Path | None = CACHE_PATH):
+        self.code = code
+        self.path = path
+        self.variants: dict[str, dict[str, dict]] = {}
+        if path is not None and path.exists():
+            data = json.loads(path.read_text(encoding='utf-8'))
+            if data.get('code') == code:
+                self.variants = data['variants']
+
+    def ministries(self, variant: str, expenses: pd.DataFrame, fingerprints: dict[str, str],
+                   build: Callable[[pd.DataFrame], dict[str, dict]]) -> tuple[dict[str, dict], list[str]]:
+        """Ministry subtrees for ``variant`` ordered by name, and which were rebuilt.
+
+        ``build`` is only called on the rows of ministries whose fingerprint
+        changed. The subtrees returned are copies, so the caller may flatten
+        or otherwise rewrite them in place.
+        """
+        cached = self.variants.setdefault(variant, {})
+        for gone in set(cached) - set(fingerprints):
+            del cached[gone]
+        changed = [name for name, fp in fingerprints.items()
+                   if cached.get(name, {}).get('fingerprint') != fp]
+        if changed:
+            built = build(expenses[expenses['Ministry Name'].isin(changed)])
+            for name in changed:
+                # None records a ministry the builder leaves out (e.g. no spending)
+                cached[name] = {'fingerprint': fingerprints[name], 'node': built.get(name)}
+        subtrees = {name: copy.deepcopy(cached[name]['node'])
+                    for name in sorted(cached) if cached[name]['node'] is not None}
+        return subtrees, changed
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({'code': self.code, 'variants': self.variants}, ensure_ascii=False),
+                       encoding='utf-8')
+        os.replace(tmp, self.path)
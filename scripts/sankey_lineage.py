@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Leaf-to-source lineage for the Sankey builds.
+
+    python scripts/sankey_lineage.py full 1234          # node id
+    python scripts/sankey_lineage.py compact "Health"   # or exact node name
+
+<name>/lineage.json maps node ids (the columnar pre-order ids also used by
+the shard index and the LOD pyramid) to the raw datastore ``_id``s summed into
+the node, as sorted inclusive [first, last] ranges:
+
+    every spending leaf the variant's leaf names can be matched to
+    every ministry node, over the rows of its traced leaves
+
+Source ids come from the cleaner's clean_expenses_<year>.lineage.json and
+refer to the one dump recorded there as ``source``, so tracing a number
+back to its records is a dict lookup plus a binary search into that dump's
+raw table, not a scan of it.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from clean_public_accounts_2024 import display_path
+from public_accounts_data import RAW_EXPENSES_PATH, ROOT, load_raw_data
+from sankey_columnar import node_names
+from sankey_output import columnar_path, shard_dir
+
+FORMAT = "sankey-lineage/1"
+OTHER = " → Other"  # see sankey_budget.other_node()
+
+
+def id_ranges(ids: np.ndarray) -> list[list[int]]:
+    """Sorted, merged [first, last] ranges covering ``ids``."""
+    ids = np.unique(ids)
+    if not len(ids):
+        return []
+    breaks = np.flatnonzero(np.diff(ids) != 1)
+    firsts = np.concatenate(([ids[0]], ids[breaks + 1]))
+    lasts = np.concatenate((ids[breaks], [ids[-1]]))
+    return [[int(a), int(b)] for a, b in zip(firsts, lasts)]
+
+
+def lineage_index(doc: dict, rows: pd.DataFrame, source_ids: np.ndarray, source: Path) -> dict:
+    """Node id -> source id ranges for a columnar spending tree.
+
+    ``rows`` holds, for the cleaned rows whose ids in the ``source`` dump
+    are ``source_ids``, the variant's leaf names (see VARIANTS in
+    build_sankey_variants.py) and their ``amount_cents``. Rows are grouped
+    by (leaf, group) and each group is matched to a tree leaf of that name
+    and amount; an "Other" leaf takes the unmatched groups of its parent.
+    A ministry's ids are those of its traced leaves, so rows the builder
+    dropped are not listed under it.
+    """
+    cents = rows['amount_cents'].to_numpy()
+    parents = rows['parent'].to_numpy()
+    # One hash grouping; .indices gives each key's row positions
+    candidates: dict[str, list[list]] = {}
+    for (leaf, _), positions in rows.groupby(['leaf', 'group'], sort=False).indices.items():
+        candidates.setdefault(leaf, []).append([int(cents[positions].sum()), parents[positions[0]], positions])
+
+    names = node_names(doc)
+    root = doc['roots']['spending_data']
+    end = next((i for i in range(root + 1, len(names)) if doc['depth'][i] == 0), len(names))
+    leaf_rows: dict[int, np.ndarray] = {}
+    others = []
+    for i in range(root + 1, end):
+        amount = doc['amount_cents'][i]
+        if amount is None:
+            continue
+        match = next((c for c in candidates.get(names[i], ()) if c[0] == amount), None)
+        if match is not None:
+            candidates[names[i]].remove(match)
+            leaf_rows[i] = match[2]
+        elif names[i].endswith(OTHER):
+            others.append(i)
+    for i in others:
+        parent = names[i][:-len(OTHER)]
+        folded = [c for group in candidates.values() for c in group if c[1] == parent]
+        if folded and sum(c[0] for c in folded) == doc['amount_cents'][i]:
+            leaf_rows[i] = np.concatenate([c[2] for c in folded])
+
+    nodes = {}
+    ministry = None
+    ministry_rows: dict[int, list[np.ndarray]] = {}
+    for i in range(root + 1, end):
+        if doc['depth'][i] == 1:
+            ministry = i
+        if i in leaf_rows:
+            nodes[str(i)] = id_ranges(source_ids[leaf_rows[i]])
+            ministry_rows.setdefault(ministry, []).append(leaf_rows[i])
+    for i, positions in ministry_rows.items():
+        if str(i) not in nodes:
+            nodes[str(i)] = id_ranges(source_ids[np.concatenate(positions)])
+    return {'format': FORMAT, 'source': display_path(source),
+            'nodes': dict(sorted(nodes.items(), key=lambda item: int(item[0])))}
+
+
+def load_lineage(output_file: str) -> dict:
+    return json.loads((shard_dir(output_file) / 'lineage.json').read_text(encoding='utf-8'))
+
+
+def source_records(ranges: list[list[int]], columns: list[str] | None = None, *,
+                   source: Path = RAW_EXPENSES_PATH) -> pd.DataFrame:
+    """Raw ``source`` records whose ``_id`` falls in ``ranges``, via binary search on ``_id``."""
+    raw = load_raw_data(None if columns is None else ['_id', *columns], source=source)
+    order = np.argsort(raw['_id'].to_numpy(), kind='stable')
+    ids = raw['_id'].to_numpy()[order]
+    rows = [order[np.searchsorted(ids, first, 'left'):np.searchsorted(ids, last, 'right')]
+            for first, last in ranges]
+    return raw.iloc[np.concatenate(rows) if rows else []]
+
+
+def main():
+    from build_sankey_variants import VARIANTS  # imports this module
+
+    parser = argparse.ArgumentParser(description="Trace a Sankey node back to its source records.")
+    parser.add_argument("variant", choices=list(VARIANTS))
+    parser.add_argument("node", help="node id or exact node name")
+    args = parser.parse_args()
+
+    output_file = VARIANTS[args.variant][0]
+    try:
+        lineage = load_lineage(output_file)
+    except FileNotFoundError:
+        print(f"❌ No lineage for {args.variant}; run the cleaner, then scripts/build_sankey_variants.py")
+        sys.exit(1)
+    node = args.node
+    if not node.isdigit():
+        doc = json.loads(columnar_path(output_file).read_text(encoding='utf-8'))
+        matches = [str(i) for i, name in enumerate(node_names(doc)) if name == node and str(i) in lineage['nodes']]
+        if not matches:
+            print(f"❌ No traced node named {node!r}")
+            sys.exit(1)
+        node = matches[0]
+    ranges = lineage['nodes'].get(node)
+    if ranges is None:
+        print(f"❌ Node {node} has no lineage (only spending leaves and ministries are traced)")
+        sys.exit(1)
+
+    records = source_records(ranges, source=ROOT / lineage['source'])
+    print(f"🔗 Node {node}: {len(records)} source records in {len(ranges)} _id range(s)")
+    print(f"   Total: ${records['amount_cents'].sum() / 100:,.2f}")
+    print(records.drop(columns=['amount_cents']).to_string(index=False, max_rows=20))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Level-of-detail pyramid over a columnar Sankey document.
+
+Starting from the two roots and their top-level children, nodes are
+expanded (their children made visible) largest subtotal first, until the
+whole tree is showing. Every level of the pyramid is a prefix of that one
+expansion order, cut where the visible node count would first exceed the
+level's budget, e.g.
+
+    level 0   <= 50 nodes
+    level 1   <= 200 nodes
+    level 2   <= 1,000 nodes
+    level 3   every node
+
+so each level contains the previous one and only has to list the nodes it
+adds. Node ids are the columnar pre-order indices, shared by every level,
+the shard index and the columnar file. A node that isn't expanded yet is drawn
+as a leaf carrying its subtree total; a client zooms in by loading the
+next level's delta and attaching each new node under its ``parent``.
+"""
+
+import heapq
+
+from public_accounts_data import cents_to_billions
+from sankey_columnar import node_names, subtree_cents
+
+LOD_BUDGETS = (50, 200, 1000)
+
+
+def lod_levels(doc: dict, budgets: tuple[int, ...] = LOD_BUDGETS) -> list[dict]:
+    """One delta per budget plus a final level that completes the tree.
+
+    Each level is {'budget', 'nodes', 'added'}: ``nodes`` is how many nodes
+    are visible once it is applied and ``added`` the node records it adds,
+    each {id, parent, name, amount} with the subtree total in billions.
+    """
+    parent = doc['parent']
+    totals = subtree_cents(doc)
+    names = node_names(doc)
+    children: list[list[int]] = [[] for _ in parent]
+    for i, up in enumerate(parent):
+        if up >= 0:
+            children[up].append(i)
+
+    def record(i: int) -> dict:
+        return {'id': i, 'parent': parent[i], 'name': names[i], 'amount': cents_to_billions(totals[i])}
+
+    # Largest absolute subtotal first; ids break ties so the order is stable
+    frontier: list[tuple[int, int]] = []
+
+    def expand(i: int) -> list[dict]:
+        for child in children[i]:
+            if children[child]:
+                heapq.heappush(frontier, (-abs(totals[child]), child))
+        return [record(child) for child in children[i]]
+
+    added = []
+    for root in doc['roots'].values():
+        added.append(record(root))
+        added.extend(expand(root))
+    visible = len(added)
+
+    levels = []
+    for budget in (*budgets, None):
+        while frontier and (budget is None or visible + len(children[frontier[0][1]]) <= budget):
+            new = expand(heapq.heappop(frontier)[1])
+            added.extend(new)
+            visible += len(new)
+        levels.append({'budget': budget, 'nodes': visible, 'added': added})
+        added = []
+    return levels
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Output stage shared by the Sankey builders.
+
+Each build is encoded once as a columnar document (see sankey_columnar.py)
+and written twice:
+
+    <name>.columnar.json   string table + parent/depth/amount arrays, minified
+    <name>.json            the nested {name, amount, children} view of it, minified
+
+Both are also published as immutable static assets named after their
+content hash, e.g. sankey_2024_compact.3f9c0a1b2c4d.json, with
+.gz and (when the brotli module is installed) .br siblings compressed at
+the highest level, so a server can send them as-is and a CDN can cache
+them forever. public/data/sankey_manifest.json maps each logical name to
+its current hashed file (and the previous one, which is kept until the
+next change); the site's Sankey component looks its data up there.
+
+For lazy drill-down the tree is also split into <name>/root.json, which
+holds the totals, every top-level node (ministries, revenue types) with
+its subtree total, and a "shards" index of node-id ranges, plus one
+<name>/<key>.json shard per top-level subtree. Node ids are the columnar
+pre-order indices, so a subtree is a contiguous id range and the index is
+a short list of [first, last] ranges rather than an entry per node.
+
+A shard is named by a hash of its tree and top-level name, and the ids
+inside it are offsets from its ``first`` id, so a ministry gaining or
+losing a node shifts the later ranges in root.json but leaves every other
+shard's name and bytes unchanged.
+
+The per-node Merkle hashes sankey_diff.py compares are written to
+.sankey_cache/<name>.merkle.json, tagged with the SHA-256 of the columnar
+file they describe, so the published assets carry no hashes.
+
+When the builder passes one, <name>/lineage.json maps nodes to the raw
+source ids summed into them (see sankey_lineage.py).
+
+The same directory holds a level-of-detail pyramid (see sankey_lod.py):
+<name>/lod/index.json lists the levels and <name>/lod/<level>.json holds
+just the nodes each level adds to the one before it.
+
+Files whose bytes would not change are left alone, so after an incremental
+build (see sankey_incremental.py) only the shards of the ministries that
+changed, root.json and the whole-tree files get new mtimes.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+from collections.abc import Callable
+from pathlib import Path
+
+from public_accounts_data import ROOT, cents_to_billions
+from sankey_columnar import (
+    columnar_document,
+    merkle_tree,
+    nested_nodes,
+    nested_view,
+    subtree_cents,
+    subtree_end,
+)
+from sankey_lod import lod_levels
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MANIFEST_PATH = ROOT / "public/data/sankey_manifest.json"
+HASH_LENGTH = 12
+
+
+def columnar_path(output_file: str | Path) -> Path:
+    path = ROOT / output_file
+    return path.with_name(f"{path.stem}.columnar.json")
+
+
+def merkle_path(output_file: str | Path) -> Path:
+    return ROOT / ".sankey_cache" / f"{Path(output_file).stem}.merkle.json"
+
+
+def minified(doc: dict) -> bytes:
+    return json.dumps(doc, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _write_atomic(path: Path, data: bytes) -> bool:
+    """Replace ``path`` with ``data`` unless it already holds exactly that."""
+    if path.exists() and path.stat().st_size == len(data) and path.read_bytes() == data:
+        return False
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    return True
+
+
+def read_manifest() -> dict:
+    if not MANIFEST_PATH.exists():
+        return {}
+    return json.loads(MANIFEST_PATH.read_text(encoding='utf-8'))
+
+
+def publish(path: Path, data: bytes) -> dict:
+    """Write ``data`` as a content-hashed asset plus compressed siblings.
+
+    ``path`` is the logical name (e.g. public/data/sankey_2024_compact.json);
+    returns its manifest entry. The manifest is updated; the asset it
+    replaces is kept for one more generation (as the entry's ``previous``)
+    so clients holding the old manifest can still fetch it, and the one
+    before that is removed.
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    hashed = path.with_name(f"{path.stem}.{digest[:HASH_LENGTH]}{path.suffix}")
+    entry = {'file': hashed.name, 'sha256': digest, 'bytes': len(data)}
+
+    compressors = {'gz': lambda raw: gzip.compress(raw, 9, mtime=0)}
+    if brotli is not None:
+        compressors['br'] = lambda raw: brotli.compress(raw, quality=11, lgwin=24)
+    if not hashed.exists():
+        _write_atomic(hashed, data)
+    for ext, compress in compressors.items():
+        # Same name means same content, so existing siblings are reused as-is.
+        target = hashed.with_name(f"{hashed.name}.{ext}")
+        if not target.exists():
+            _write_atomic(target, compress(data))
+        entry[f"{ext}_bytes"] = target.stat().st_size
+
+    manifest = read_manifest()
+    current = manifest.get(path.name, {})
+    previous = current.get('previous') if current.get('file') == hashed.name else current.get('file')
+    if previous:
+        entry['previous'] = previous
+    manifest[path.name] = entry
+    _write_atomic(MANIFEST_PATH, (json.dumps(dict(sorted(manifest.items())), indent=2) + '\n').encode())
+    stale = current.get('previous')
+    if stale and stale not in (hashed.name, previous):
+        for suffix in ('', '.gz', '.br'):
+            path.with_name(stale + suffix).unlink(missing_ok=True)
+    return entry
+
+
+def shard_dir(output_file: str | Path) -> Path:
+    path = ROOT / output_file
+    return path.with_name(path.stem)
+
+
+def shard_key(tree: str, name: str) -> str:
+    """Stable file key for a top-level subtree, independent of its node ids."""
+    return hashlib.sha256(f"{tree}/{name}".encode('utf-8')).hexdigest()[:HASH_LENGTH]
+
+
+def write_shards(output_file: str | Path, doc: dict) -> dict:
+    """Write the root file and one shard per top-level subtree; returns the root."""
+    nodes = nested_nodes(doc, ids=True)
+    totals = subtree_cents(doc)
+    end = subtree_end(doc)
+    directory = shard_dir(output_file)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    root = {key: doc[key] for key in ('total', 'spending', 'revenue')}
+    shards = []
+    for tree, index in doc['roots'].items():
+        stubs = []
+        for child in nodes[index].get('children', []):
+            if 'children' not in child:
+                stubs.append(child)  # a leaf has nothing further to load
+                continue
+            i = child['id']
+            shard = f"{shard_key(tree, child['name'])}.json"
+            for node in nodes[i:end[i]]:
+                node['id'] -= i  # relative, so the shard doesn't change when earlier ids shift
+            _write_atomic(directory / shard, minified(child))
+            shards.append({'file': shard, 'first': i, 'last': end[i] - 1})
+            stubs.append({'id': i, 'name': child['name'], 'amount': cents_to_billions(totals[i]), 'shard': shard})
+        root[tree] = {'id': index, 'name': nodes[index]['name'], 'children': stubs}
+    root['shards'] = shards
+    _write_atomic(directory / 'root.json', minified(root))
+
+    keep = {'root.json', 'lineage.json', *(shard['file'] for shard in shards)}
+    for stale in directory.glob('*.json'):
+        if stale.name not in keep:
+            stale.unlink()
+    return root
+
+
+def write_lod(output_file: str | Path, doc: dict) -> dict:
+    """Write the level-of-detail deltas and their index; returns the index."""
+    directory = shard_dir(output_file) / 'lod'
+    directory.mkdir(parents=True, exist_ok=True)
+    index = {'levels': []}
+    for level, delta in enumerate(lod_levels(doc)):
+        name = f"{level}.json"
+        _write_atomic(directory / name, minified({'level': level, **delta}))
+        index['levels'].append({'file': name, 'budget': delta['budget'], 'nodes': delta['nodes']})
+    _write_atomic(directory / 'index.json', minified(index))
+
+    keep = {'index.json', *(level['file'] for level in index['levels'])}
+    for stale in directory.glob('*.json'):
+        if stale.name not in keep:
+            stale.unlink()
+    return index
+
+
+def write_sankey(output_file: str | Path, spending_data: dict, revenue_data: dict,
+                 lineage: Callable[[dict], dict] | None = None) -> dict:
+    """Write and publish both encodings of a build; returns the nested view.
+
+    ``lineage`` maps the columnar document to the lineage index to write
+    beside the shards; without it any previous lineage file is removed.
+    """
+    doc = columnar_document(spending_data, revenue_data)
+    columnar = minified(doc)
+    _write_atomic(columnar_path(output_file), columnar)
+    publish(columnar_path(output_file), columnar)
+    size, hashes = merkle_tree(doc)
+    merkle_path(output_file).parent.mkdir(exist_ok=True)
+    _write_atomic(merkle_path(output_file), minified({
+        'columnar_sha256': hashlib.sha256(columnar).hexdigest(), 'subtree_size': size, 'merkle': hashes}))
+
+    view = nested_view(doc)
+    nested = minified(view)
+    _write_atomic(ROOT / output_file, nested)
+    publish(ROOT / output_file, nested)
+    write_shards(output_file, doc)
+    write_lod(output_file, doc)
+    lineage_path = shard_dir(output_file) / 'lineage.json'
+    if lineage is not None:
+        _write_atomic(lineage_path, minified(lineage(doc)))
+    else:
+        lineage_path.unlink(missing_ok=True)
+    return view
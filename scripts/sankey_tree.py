@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Shared tree type for Sankey {name, amount, children} hierarchies.
+
+SankeyNode wraps a builder's cents-valued tree or a Sankey JSON tree read
+back from public/data, and stores on every node four figures computed
+once, bottom-up, in a single iterative post-order pass:
+
+    subtotal     cents under the node (its own amount if it has one)
+    leaf_count   leaves under the node (1 for a leaf)
+    size         nodes in the subtree, the node included
+    depth        0 for the root
+
+so the total of any subtree is an attribute lookup instead of another
+recursive walk, and deep trees never hit Python's recursion limit.
+"""
+
+from collections.abc import Callable, Iterator
+
+from public_accounts_data import billions_to_cents, cents_to_billions
+
+
+class SankeyNode:
+    __slots__ = ('name', 'amount', 'children', 'parent', 'depth', 'subtotal', 'leaf_count', 'size')
+
+    def __init__(self, name: str, amount: int | None = None, parent: 'SankeyNode | None' = None):
+        self.name = name
+        self.amount = amount
+        self.children: list[SankeyNode] = []
+        self.parent = parent
+        self.depth = parent.depth + 1 if parent is not None else 0
+        self.subtotal = 0
+        self.leaf_count = 0
+        self.size = 0
+
+    @classmethod
+    def from_dict(cls, data: dict, to_cents: Callable[[float], int] = int) -> 'SankeyNode':
+        """Wrap a nested tree; ``to_cents`` converts its ``amount`` values."""
+        order: list[SankeyNode] = []
+        stack: list[tuple[dict, SankeyNode | None]] = [(data, None)]
+        while stack:
+            raw, up = stack.pop()
+            amount = raw.get('amount')
+            node = cls(raw['name'], None if amount is None else to_cents(amount), up)
+            if up is not None:
+                up.children.append(node)
+            order.append(node)
+            # Reversed pushes pop in document order, so children keep theirs
+            stack.extend((child, node) for child in reversed(raw.get('children', ())))
+
+        # Pre-order reversed visits every child before its parent
+        for node in reversed(order):
+            if node.amount is not None:
+                node.subtotal = node.amount
+            if not node.children:
+                node.leaf_count = 1
+            node.size += 1
+            up = node.parent
+            if up is not None:
+                if up.amount is None:
+                    up.subtotal += node.subtotal
+                up.leaf_count += node.leaf_count
+                up.size += node.size
+        return order[0]
+
+    @classmethod
+    def from_cents(cls, data: dict) -> 'SankeyNode':
+        """Tree as the builders produce it, amounts in integer cents."""
+        return cls.from_dict(data)
+
+    @classmethod
+    def from_billions(cls, data: dict) -> 'SankeyNode':
+        """Tree from a written Sankey JSON file, amounts in billions of dollars."""
+        return cls.from_dict(data, billions_to_cents)
+
+    @property
+    def billions(self) -> float:
+        return cents_to_billions(self.subtotal)
+
+    def child(self, name: str) -> 'SankeyNode | None':
+        """The direct child called ``name``, if any."""
+        return next((child for child in self.children if child.name == name), None)
+
+    def __iter__(self) -> Iterator['SankeyNode']:
+        """Every node of the subtree in pre-order, without recursion."""
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.children))
+
+    def __repr__(self) -> str:
+        return f"SankeyNode({self.name!r}, subtotal={self.subtotal}, leaves={self.leaf_count}, depth={self.depth})"
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Year-over-year deltas for the Sankey hierarchy across fiscal years.
+
+    python scripts/sankey_yoy.py 2023 2024            # -> public/data/sankey_yoy_2023_2024.json
+    python scripts/sankey_yoy.py 2015 2016 ... 2024
+
+Every year's cleaned table is summed to its leaf grain, the years are
+stacked and pivoted into one leaf x year matrix - a single hash join on the
+hierarchy key, however many years there are - and each hierarchy level is
+rolled up from that matrix. A node's key is its path of labels (ministry,
+program, ...), so nodes line up across years even when a program appears,
+disappears or moves position. A node missing from a year counts as zero
+there. As in build_ministry_trees(), a blank activity or sub item level is
+skipped (its children hang off the nearest labelled ancestor) and account
+details are folded into the account label, so the tree has the full
+Sankey's shape.
+
+The output is columnar like sankey_columnar.py, one tree per side:
+
+    label          the node's own label
+    parent, depth  tree shape; the root has parent -1 and depth 0
+    amount_cents   {year: [cents per node]}
+    delta_cents    {year: [change from the previous year]}
+    growth         {year: [delta / |previous|]}, null where previous is 0
+"""
+
+import argparse
+import json
+import sys
+
+import numpy as np
+import pandas as pd
+
+from public_accounts_data import ROOT, aggregate_cents, cleaned_path, load_expenses, load_revenue
+from sankey_output import publish
+
+FORMAT = "sankey-yoy/1"
+
+# Hierarchy levels of the full spending tree (transform_sankey_data.py)
+SPENDING_LEVELS = [
+    "Ministry Name",
+    "Program Name",
+    "Activity / Item",
+    "Sub Item",
+    "Standard Account (Expense/Asset Name)",
+]
+ACCOUNT = "Standard Account (Expense/Asset Name)"
+DETAILS = "Account Details (Expense/Asset Details)"
+REVENUE_LEVELS = ["revenue_type", "revenue_detail"]
+
+
+def with_account_details(df: pd.DataFrame) -> pd.DataFrame:
+    """Fold account details into the account label, "Account: Details"."""
+    details = df[DETAILS]
+    blank = details.isna() | details.isin(['', 'No Value'])
+    return df.assign(**{ACCOUNT: df[ACCOUNT].where(blank, df[ACCOUNT] + ': ' + details)})
+
+
+def year_matrix(frames: dict[int, pd.DataFrame], levels: list[str]) -> pd.DataFrame:
+    """Leaf x year cents, joined on the full hierarchy key in one pivot."""
+    stacked = pd.concat(
+        [aggregate_cents(df, levels).assign(year=year) for year, df in frames.items()],
+        ignore_index=True,
+    )
+    # Blank labels are a key like any other; '' keeps them in the join
+    stacked[levels] = stacked[levels].fillna('').replace('No Value', '')
+    matrix = stacked.pivot_table(index=levels, columns='year', values='amount_cents',
+                                 aggfunc='sum', fill_value=0)
+    return matrix.reindex(columns=sorted(frames), fill_value=0).astype('int64')
+
+
+def node_table(matrix: pd.DataFrame) -> tuple[pd.DataFrame, list[str | None]]:
+    """Every hierarchy node, root first and in key order, with its yearly cents.
+
+    Levels are rolled up from the leaf matrix with one groupby each, so the
+    work tracks the number of leaves, not the number of years. Returns the
+    nodes (with ``parent`` and ``depth``) and their labels.
+    """
+    levels = list(matrix.index.names)
+    parts = [pd.DataFrame([matrix.sum().to_numpy()], columns=matrix.columns).assign(depth=0)]
+    for depth in range(1, len(levels) + 1):
+        rolled = matrix.groupby(level=levels[:depth], sort=False).sum() if depth < len(levels) else matrix
+        parts.append(rolled.reset_index().assign(depth=depth))
+    nodes = pd.concat(parts, ignore_index=True)
+    # Padding with None sorts a parent's key just before its children's
+    nodes = nodes.sort_values(levels + ['depth'], na_position='first', kind='stable', ignore_index=True)
+
+    keys = list(nodes[levels].itertuples(index=False, name=None))
+    level = nodes['depth'].tolist()
+    # Blank intermediate levels are skipped; a blank leaf still carries cents
+    keep = [d == 0 or d == len(levels) or key[d - 1] != '' for key, d in zip(keys, level)]
+    nodes = nodes[keep].reset_index(drop=True)
+    keys = [key[:d] for key, d, k in zip(keys, level, keep) if k]
+
+    position = {key: i for i, key in enumerate(keys)}
+    parent, depth = [], []
+    for key in keys:
+        up = len(key) - 1
+        while up > 0 and key[:up] not in position:
+            up -= 1
+        parent.append(position[key[:up]] if key else -1)
+        depth.append(depth[parent[-1]] + 1 if key else 0)
+    nodes['parent'] = parent
+    nodes['depth'] = depth
+    labels = [(key[-1] or None) if key else None for key in keys]
+    return nodes, labels
+
+
+def deltas(nodes: pd.DataFrame, years: list[int]) -> tuple[np.ndarray, np.ndarray]:
+    """Per-node change and growth rate for every year after the first."""
+    amounts = nodes[years].to_numpy(dtype='int64')
+    change = np.diff(amounts, axis=1)
+    previous = np.abs(amounts[:, :-1]).astype('float64')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth = np.where(previous != 0, change / previous, np.nan)
+    return change, growth
+
+
+def yoy_tree(frames: dict[int, pd.DataFrame], levels: list[str], root: str) -> dict:
+    years = sorted(frames)
+    nodes, labels = node_table(year_matrix(frames, levels))
+    change, growth = deltas(nodes, years)
+    return {
+        'root': root,
+        'levels': levels,
+        'label': labels,
+        'parent': nodes['parent'].tolist(),
+        'depth': nodes['depth'].tolist(),
+        'amount_cents': {str(year): nodes[year].tolist() for year in years},
+        'delta_cents': {str(year): change[:, i].tolist() for i, year in enumerate(years[1:])},
+        'growth': {str(year): [None if np.isnan(g) else round(float(g), 6) for g in growth[:, i]]
+                   for i, year in enumerate(years[1:])},
+    }
+
+
+def yoy_document(years: list[int]) -> dict:
+    """Spending and revenue deltas across ``years`` from their cleaned tables."""
+    expenses = {year: with_account_details(load_expenses(year)) for year in years}
+    revenue = {year: load_revenue(year) for year in years}
+    return {
+        'format': FORMAT,
+        'years': sorted(years),
+        'spending': yoy_tree(expenses, SPENDING_LEVELS, 'Spending'),
+        'revenue': yoy_tree(revenue, REVENUE_LEVELS, 'Revenue'),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Year-over-year Sankey deltas from cleaned tables.")
+    parser.add_argument("years", nargs="+", type=int, metavar="year")
+    args = parser.parse_args()
+    years = sorted(set(args.years))
+    if len(years) < 2:
+        parser.error("need at least two fiscal years")
+    missing = [str(cleaned_path(kind, year).name) for year in years for kind in ("expenses", "revenue")
+               if not cleaned_path(kind, year).exists() and not cleaned_path(kind, year, ".arrow").exists()]
+    if missing:
+        print(f"❌ Missing cleaned tables: {', '.join(missing)}")
+        sys.exit(1)
+
+    doc = yoy_document(years)
+    output_file = ROOT / f"public/data/sankey_yoy_{years[0]}_{years[-1]}.json"
+    data = json.dumps(doc, ensure_ascii=False, allow_nan=False, separators=(',', ':')).encode('utf-8')
+    output_file.write_bytes(data)
+    publish(output_file, data)
+
+    spending = doc['spending']['amount_cents']
+    print(f"✅ {len(doc['spending']['parent'])} spending and {len(doc['revenue']['parent'])} revenue nodes "
+          f"across {len(years)} years → {output_file.relative_to(ROOT)}")
+    for previous, year in zip(years, years[1:]):
+        before, after = spending[str(previous)][0], spending[str(year)][0]
+        print(f"   • {previous} → {year}: spending {(after - before) / 1e11:+.2f}B")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Operational-vs-substantive classification of expense accounts.
+
+The strategic and compact Sankeys fold operational spending (salaries,
+supplies, services, ...) into a single "Operations" node per program and
+keep substantive program spending (transfers, grants, ...) as its own
+nodes. The rule only looks at the account name and account details, so it
+is evaluated once per distinct (account, details) pair with precompiled
+patterns and broadcast back to the rows.
+
+Decisions and display names are memoized per (account, details) pair in a
+ClassificationCache, so every builder in a process - and, when the cache
+is saved to disk, every later run and fiscal year - only classifies pairs
+it has never seen.
+"""
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ACCOUNT_COLUMN = 'Standard Account (Expense/Asset Name)'
+DETAILS_COLUMN = 'Account Details (Expense/Asset Details)'
+
+# Categories to consolidate into "Operations"
+OPERATIONAL_CATEGORIES = {
+    'Salaries and wages',
+    'Employee benefits',
+    'Transportation and communication',
+    'Services',
+    'Supplies and equipment',
+    'Recoveries',  # Usually operational adjustments
+    'Other transactions',  # Often administrative
+    'Amortization',
+    'Bad Debt Expense'
+}
+
+# Account details mentioning any of these suggest substantive program spending
+SUBSTANTIVE_KEYWORDS = [
+    'program', 'grant', 'fund', 'transfer', 'payment',
+    'subsidy', 'benefit', 'insurance', 'pension'
+]
+
+CAPITAL_ACCOUNTS = {'capital expense', 'capital'}
+
+CACHE_PATH = Path(__file__).resolve().parent.parent / '.sankey_cache' / 'categories.json'
+
+
+def _any_of(words) -> re.Pattern:
+    return re.compile('|'.join(re.escape(w.lower()) for w in sorted(words)))
+
+
+_OPERATIONAL = _any_of(OPERATIONAL_CATEGORIES)
+_SUBSTANTIVE = _any_of(SUBSTANTIVE_KEYWORDS)
+
+# Persisted entries are only reused while the rules that produced them match.
+# The keyword lists and the functions applying them all live in this file, so
+# its source is the digest (as in sankey_incremental.source_digest()).
+RULES_DIGEST = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()[:16]
+
+
+def _is_operational(account_name: str, account_details: str) -> bool:
+    account = account_name.lower()
+    if _OPERATIONAL.search(account):
+        return True
+
+    # Keep substantive program spending separate
+    if 'transfer payments' in account or account in CAPITAL_ACCOUNTS:
+        return False
+    if account_details and _SUBSTANTIVE.search(account_details.lower()):
+        return False
+
+    return True
+
+
+def _category_name(account_name: str, account_details: str) -> str:
+    if not account_details:
+        return account_name
+    if 'transfer payments' in account_name.lower():
+        # Transfer payments - use the program/recipient name
+        return account_details
+    return f"{account_name}: {account_details}"
+
+
+def _classify_unique(accounts: pd.Series, details: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """Vectorized rules over distinct pairs (details already blank-filled)."""
+    account = accounts.str.lower()
+    operational = account.str.contains(_OPERATIONAL)
+    transfer = account.str.contains('transfer payments', regex=False)
+    substantive = transfer | account.isin(CAPITAL_ACCOUNTS) | details.str.lower().str.contains(_SUBSTANTIVE)
+    has_details = details != ''
+    names = accounts.where(~has_details, accounts + ': ' + details).where(~(transfer & has_details), details)
+    return (operational | ~substantive).to_numpy(dtype=bool), names.to_numpy(dtype=object)
+
+
+class ClassificationCache:
+    """Memo of (account, details) -> (consolidate into Operations?, display name).
+
+    ``hits`` and ``misses`` count distinct pairs looked up; a blank and a
+    missing details value are the same key.
+    """
+
+    def __init__(self, path: Path | None = None):
+        self.path = path
+        self.entries: dict[tuple[str, str], tuple[bool, str]] = {}
+        self.hits = 0
+        self.misses = 0
+        if path is not None and path.exists():
+            data = json.loads(path.read_text(encoding='utf-8'))
+            if data.get('rules') == RULES_DIGEST:
+                self.entries = {(a, d): (flag, name) for a, d, flag, name in data['entries']}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def classify(self, account_name: str, account_details: str | None) -> tuple[bool, str]:
+        key = (account_name, account_details if isinstance(account_details, str) else '')
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            entry = self.entries[key] = (_is_operational(*key), _category_name(*key))
+        else:
+            self.hits += 1
+        return entry
+
+    def classify_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """``is_operational`` and ``category`` columns for every row of ``df``.
+
+        Each distinct pair is looked up once; pairs not cached yet are
+        classified together with vectorized regex matches.
+        """
+        pairs = pd.DataFrame({'account': df[ACCOUNT_COLUMN], 'details': df[DETAILS_COLUMN].fillna('')})
+        codes = pairs.groupby(['account', 'details'], dropna=False, sort=False).ngroup().to_numpy()
+        keys = list(pairs.drop_duplicates().itertuples(index=False, name=None))
+
+        missing = [key for key in keys if key not in self.entries]
+        self.hits += len(keys) - len(missing)
+        self.misses += len(missing)
+        if missing:
+            new = pd.DataFrame(missing, columns=['account', 'details'])
+            flags, names = _classify_unique(new['account'], new['details'])
+            self.entries.update(zip(missing, zip(flags.tolist(), names.tolist())))
+
+        flags = np.fromiter((self.entries[key][0] for key in keys), dtype=bool, count=len(keys))
+        names = np.array([self.entries[key][1] for key in keys], dtype=object)
+        return pd.DataFrame({'is_operational': flags[codes], 'category': names[codes]}, index=df.index)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self),
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        entries = sorted([a, d, flag, name] for (a, d), (flag, name) in self.entries.items())
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({'rules': RULES_DIGEST, 'entries': entries}, ensure_ascii=False), encoding='utf-8')
+        os.replace(tmp, self.path)
+
+
+# In-memory by default; build_sankey_variants.py swaps in a persisted one.
+CATEGORY_CACHE = ClassificationCache()
+
+
+def use_cache(cache: ClassificationCache) -> None:
+    """Route every classification in this process through ``cache``."""
+    global CATEGORY_CACHE
+    CATEGORY_CACHE = cache
+
+
+def should_consolidate_category(account_name: str, account_details: str) -> bool:
+    """Determine if this should be consolidated into Operations."""
+    return CATEGORY_CACHE.classify(account_name, account_details)[0]
+
+
+def operational_mask(df: pd.DataFrame) -> pd.Series:
+    """Column-level should_consolidate_category() for an expense frame."""
+    return CATEGORY_CACHE.classify_frame(df)['is_operational']
+
+
+def category_names(df: pd.DataFrame) -> pd.Series:
+    """Label for substantive spending: the recipient for transfer payments,
+    "account: details" when there are details, else the account name."""
+    return CATEGORY_CACHE.classify_frame(df)['category']
+
+
+def substantive_categories(df: pd.DataFrame) -> pd.Series:
+    """category_names() for substantive rows, null for operational ones."""
+    classified = CATEGORY_CACHE.classify_frame(df)
+    return classified['category'].where(~classified['is_operational'])
+
+
+def program_category_totals(df: pd.DataFrame, detail_columns: list[str] = ()) -> pd.DataFrame:
+    """Sum cents per (ministry, program, category, *detail_columns) in one groupby.
+
+    Operational rows collapse into a single row per program whose category
+    (and detail columns) are null. Rows keep the order their group is first
+    seen in ``df``, so iterating a program's rows lists its substantive
+    categories in the same order a row-by-row pass would meet them.
+    """
+    keys = ['category', *detail_columns]
+    category = substantive_categories(df)
+    labels = df[list(detail_columns)].assign(category=category)[keys]
+    labels = labels.where(category.notna())
+    grouped = pd.concat([df[['Ministry Name', 'Program Name']], labels, df['amount_cents']], axis=1)
+    return (grouped.groupby(['Ministry Name', 'Program Name', *keys], dropna=False, sort=False)['amount_cents']
+                   .sum().reset_index())
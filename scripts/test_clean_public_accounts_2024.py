@@ -0,0 +1,44 @@
+"""Tests for the streaming expense cleaner's control totals."""
+import json
+
+from clean_public_accounts_2024 import clean_expenses, output_path
+
+FIELDS = [
+    "_id",
+    "Year",
+    "Ministry Name",
+    "Expenditure Category (Operating / Capital)",
+    "Program Name",
+    "Activity / Item",
+    "Sub Item",
+    "Standard Account (Expense/Asset Name)",
+    "Account Details (Expense/Asset Details)",
+    "Amount $",
+]
+
+
+def write_dump(path, records):
+    path.write_text(json.dumps({"fields": [{"id": f} for f in FIELDS], "records": records}), encoding="utf-8")
+
+
+def test_null_and_no_value_labels_balance(tmp_path):
+    source = tmp_path / "dump.json"
+    write_dump(source, [
+        [1, "2023-24", "Health", None, "P", "", "", "Salaries", "", "100.50"],
+        [2, "2023-24", " Health ", "No Value", "P", "", "", "Salaries", "", "20"],
+        [3, "2023-24", None, "Operating", "P", "", "", "Salaries", "", "3"],
+        [4, "2023-24", "Health", "Operating", "P", "", "", "Salaries", "", ""],
+    ])
+    clean_expenses({2024}, source=source, out_dir=tmp_path)
+
+    totals = json.loads(output_path("expenses", 2024, ".totals.json", tmp_path).read_text(encoding="utf-8"))
+    assert totals["balanced_cents"]
+    assert totals["overall"]["raw"] == {"rows": 4, "blank_amounts": 1, "cents": 12350}
+    by_ministry = totals["by"]["Ministry Name"]
+    assert list(by_ministry) == ["", "Health"]
+    assert by_ministry["Health"]["emitted"] == {"rows": 2, "cents": 12050}
+    by_category = totals["by"]["Expenditure Category (Operating / Capital)"]
+    assert list(by_category) == ["", "Operating"]
+    for label in by_category.values():
+        assert label["raw"]["cents"] == label["emitted"]["cents"]
+    assert by_category[""]["raw"]["rows"] == 2
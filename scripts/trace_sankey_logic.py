@@ -3,15 +3,18 @@
 Trace the exact Sankey generation logic to find data loss.
 """
 
-import pandas as pd
 import json
 
+from public_accounts_data import load_expenses
+from spending_categories import operational_mask
+
 def trace_sankey_generation():
     print("🔍 TRACING SANKEY GENERATION LOGIC")
     print("=" * 60)
     
     # Load the processed data
-    df = pd.read_csv('clean_expenses_2024.csv')
+    df = load_expenses()
+    df['is_operational'] = operational_mask(df)
     print(f"Input CSV total: ${df['amount_dollars'].sum():,.0f}")
     print(f"Input CSV records: {len(df)}")
     
@@ -41,7 +44,7 @@ def trace_sankey_generation():
                 records_processed += 1
                 
                 # Apply the consolidation logic
-                if should_consolidate_category(account_name, account_details):
+                if row['is_operational']:
                     # This goes into operations
                     total_operational += amount
                     program_total += amount
@@ -71,43 +74,6 @@ def trace_sankey_generation():
     print(f"   Actual Sankey file: ${actual_sankey_total:,.0f}")
     print(f"   Difference: ${total_included_in_sankey - actual_sankey_total:,.0f}")
 
-def should_consolidate_category(account_name: str, account_details: str) -> bool:
-    """Same logic as in our compact sankey script"""
-    OPERATIONAL_CATEGORIES = {
-        'Salaries and wages',
-        'Employee benefits', 
-        'Transportation and communication',
-        'Services',
-        'Supplies and equipment',
-        'Recoveries',
-        'Other transactions',
-        'Amortization',
-        'Bad Debt Expense'
-    }
-    
-    # Check if it's in our operational categories
-    for op_cat in OPERATIONAL_CATEGORIES:
-        if op_cat.lower() in account_name.lower():
-            return True
-    
-    # Keep substantive program spending separate
-    if 'transfer payments' in account_name.lower():
-        return False
-        
-    if account_name.lower() in ['capital expense', 'capital']:
-        return False
-        
-    # Check account details for specific programs/grants
-    if pd.notna(account_details) and account_details != '':
-        details_lower = account_details.lower()
-        if any(keyword in details_lower for keyword in [
-            'program', 'grant', 'fund', 'transfer', 'payment', 
-            'subsidy', 'benefit', 'insurance', 'pension'
-        ]):
-            return False
-    
-    return True
-
 def check_individual_ministry_totals():
     """Check if individual ministry totals match between raw and Sankey"""
     
@@ -115,7 +81,7 @@ def check_individual_ministry_totals():
     print(f"🔍 CHECKING INDIVIDUAL MINISTRY TOTALS")
     print(f"{'='*60}")
     
-    df = pd.read_csv('clean_expenses_2024.csv')
+    df = load_expenses()
     
     with open('public/data/sankey_2024_compact.json', 'r') as f:
         sankey_data = json.load(f)
@@ -7,10 +7,19 @@ unique node names based on the full hierarchical path.
 """
 
 import pandas as pd
-import json
 import sys
 from typing import Dict, List, Any
 
+from public_accounts_data import (
+    aggregate_expenses,
+    aggregate_revenue,
+    cents_to_billions,
+    load_expenses,
+    load_revenue,
+)
+from sankey_output import write_sankey
+from sankey_tree import SankeyNode
+
 def create_hierarchical_name(row: pd.Series, level: str) -> str:
     """Create a unique hierarchical name based on the full path."""
     parts = []
@@ -53,8 +62,49 @@ def create_hierarchical_name(row: pd.Series, level: str) -> str:
     
     return row['Ministry Name']  # fallback
 
+def hierarchical_names(df: pd.DataFrame) -> pd.DataFrame:
+    """Ministry, program and account node names for every row, column-wise.
+    
+    Vectorized create_hierarchical_name() for the 'ministry', 'program' and
+    'account' levels; NaN and '' labels are blank.
+    """
+    labels = df[['Ministry Name', 'Program Name', 'Activity / Item', 'Sub Item',
+                 'Standard Account (Expense/Asset Name)',
+                 'Account Details (Expense/Asset Details)']].astype(object)
+    labels = labels.mask(labels.isna() | (labels == ''))
+    ministry = labels['Ministry Name'].fillna('')
+    program = ministry + ' → ' + labels['Program Name'].fillna('')
+    path = program
+    for column in ('Activity / Item', 'Sub Item'):
+        path = path.where(labels[column].isna(), path + ' → ' + labels[column])
+    account = labels['Standard Account (Expense/Asset Name)'].fillna('')
+    details = labels['Account Details (Expense/Asset Details)']
+    account = account.where(details.isna(), account + ': ' + details)
+    return pd.DataFrame({'ministry': ministry, 'program': program, 'account': path + ' → ' + account},
+                        index=df.index)
+
+def leaf_names(df: pd.DataFrame) -> pd.DataFrame:
+    """The full-tree leaf every row is summed into, for sankey_lineage.
+
+    Account-level names are unique, so there is no ``group`` to tell
+    same-named leaves apart and no "Other" ``parent``.
+    """
+    return pd.DataFrame({'leaf': hierarchical_names(df)['account'], 'parent': None, 'group': ''},
+                        index=df.index)
+
 def build_hierarchy_tree(df: pd.DataFrame) -> Dict[str, Any]:
     """Build a hierarchical tree structure for the Sankey diagram."""
+    return spending_tree(build_ministry_trees(df))
+
+def spending_tree(ministries: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Root spending node over ministry subtrees (keyed and ordered by name)."""
+    return {
+        'name': 'Spending',
+        'children': list(ministries.values())
+    }
+
+def build_ministry_trees(df: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+    """One subtree per ministry in ``df``, keyed by ministry name."""
     
     # Group by ministry
     ministries = {}
@@ -89,7 +139,7 @@ def build_hierarchy_tree(df: pd.DataFrame) -> Dict[str, Any]:
                             for (account_name, account_details), account_group in account_groups:
                                 account_node = {
                                     'name': create_hierarchical_name(account_group.iloc[0], 'account'),
-                                    'amount': float(account_group['amount_dollars'].sum()) / 1e9  # Convert to billions
+                                    'amount': int(account_group['amount_cents'].sum())
                                 }
                                 program_node['children'].append(account_node)
                         else:
@@ -104,7 +154,7 @@ def build_hierarchy_tree(df: pd.DataFrame) -> Dict[str, Any]:
                             for (account_name, account_details), account_group in account_groups:
                                 account_node = {
                                     'name': create_hierarchical_name(account_group.iloc[0], 'account'),
-                                    'amount': float(account_group['amount_dollars'].sum()) / 1e9  # Convert to billions
+                                    'amount': int(account_group['amount_cents'].sum())
                                 }
                                 sub_item_node['children'].append(account_node)
                             
@@ -127,7 +177,7 @@ def build_hierarchy_tree(df: pd.DataFrame) -> Dict[str, Any]:
                             for (account_name, account_details), account_group in account_groups:
                                 account_node = {
                                     'name': create_hierarchical_name(account_group.iloc[0], 'account'),
-                                    'amount': float(account_group['amount_dollars'].sum()) / 1e9  # Convert to billions
+                                    'amount': int(account_group['amount_cents'].sum())
                                 }
                                 activity_node['children'].append(account_node)
                         else:
@@ -142,7 +192,7 @@ def build_hierarchy_tree(df: pd.DataFrame) -> Dict[str, Any]:
                             for (account_name, account_details), account_group in account_groups:
                                 account_node = {
                                     'name': create_hierarchical_name(account_group.iloc[0], 'account'),
-                                    'amount': float(account_group['amount_dollars'].sum()) / 1e9  # Convert to billions
+                                    'amount': int(account_group['amount_cents'].sum())
                                 }
                                 sub_item_node['children'].append(account_node)
                             
@@ -154,14 +204,12 @@ def build_hierarchy_tree(df: pd.DataFrame) -> Dict[str, Any]:
         
         ministries[ministry_name] = ministry_node
     
-    return {
-        'name': 'Spending',
-        'children': list(ministries.values())
-    }
+    return ministries
 
-def load_revenue_data() -> Dict[str, Any]:
+def load_revenue_data(df: pd.DataFrame | None = None) -> Dict[str, Any]:
     """Load and transform revenue data with hierarchical names."""
-    df = pd.read_csv('clean_revenue_2024.csv')
+    if df is None:
+        df = aggregate_revenue(load_revenue())
     
     # Group by revenue type
     revenue_types = {}
@@ -176,12 +224,12 @@ def load_revenue_data() -> Dict[str, Any]:
         for revenue_detail, detail_group in type_group.groupby('revenue_detail'):
             if revenue_detail == revenue_type:
                 # No sub-category, create direct amount node
-                type_node['amount'] = float(detail_group['amount_dollars'].sum()) / 1e9
+                type_node['amount'] = int(detail_group['amount_cents'].sum())
             else:
                 # Has sub-category
                 detail_node = {
                     'name': f"{revenue_type} → {revenue_detail}",
-                    'amount': float(detail_group['amount_dollars'].sum()) / 1e9
+                    'amount': int(detail_group['amount_cents'].sum())
                 }
                 type_node['children'].append(detail_node)
         
@@ -194,7 +242,7 @@ def load_revenue_data() -> Dict[str, Any]:
 
 def main():
     print("Loading expense data...")
-    df = pd.read_csv('clean_expenses_2024.csv')
+    df = aggregate_expenses(load_expenses())
     
     print("Building spending hierarchy...")
     spending_data = build_hierarchy_tree(df)
@@ -202,49 +250,25 @@ def main():
     print("Loading revenue data...")
     revenue_data = load_revenue_data()
     
-    # Calculate totals
-    def calculate_total(node):
-        if 'amount' in node:
-            return node['amount']
-        elif 'children' in node:
-            return sum(calculate_total(child) for child in node['children'])
-        else:
-            return 0
-    
-    spending_total = calculate_total(spending_data)
-    revenue_total = calculate_total(revenue_data)
+    # Subtotals, leaf counts and sizes in one pass per tree
+    spending = SankeyNode.from_cents(spending_data)
+    revenue = SankeyNode.from_cents(revenue_data)
+    spending_total = spending.subtotal
+    revenue_total = revenue.subtotal
     
-    print(f"Spending total: ${spending_total:.2f}B")
-    print(f"Revenue total: ${revenue_total:.2f}B")
-    
-    # Create final Sankey data structure
-    sankey_data = {
-        'total': max(spending_total, revenue_total),
-        'spending': spending_total,
-        'revenue': revenue_total,
-        'spending_data': spending_data,
-        'revenue_data': revenue_data
-    }
+    print(f"Spending total: ${cents_to_billions(spending_total):.2f}B")
+    print(f"Revenue total: ${cents_to_billions(revenue_total):.2f}B")
     
     # Write to file
     output_file = 'public/data/sankey_2024_fixed.json'
     print(f"Writing Sankey data to {output_file}...")
     
-    with open(output_file, 'w') as f:
-        json.dump(sankey_data, f, indent=2)
+    write_sankey(output_file, spending_data, revenue_data)
     
     print("✅ Sankey data transformation complete!")
-    print(f"   • Revenue nodes: {count_nodes(revenue_data)}")
-    print(f"   • Spending nodes: {count_nodes(spending_data)}")
+    print(f"   • Revenue nodes: {revenue.size}")
+    print(f"   • Spending nodes: {spending.size}")
     print(f"   • All nodes now have unique hierarchical names")
 
-def count_nodes(node):
-    """Count total nodes in tree."""
-    count = 1
-    if 'children' in node:
-        for child in node['children']:
-            count += count_nodes(child)
-    return count
-
 if __name__ == '__main__':
     main() 
\ No newline at end of file
@@ -5,11 +5,25 @@ import { useEffect, useState } from "react";
 import { SankeyChart } from "./SankeyChart";
 import { SankeyData } from "./SankeyChartD3";
 
+const SANKEY_FILE = "sankey_2024_compact.json";
+
+// scripts/sankey_output.py publishes each build under a content-hashed name
+// listed in sankey_manifest.json; without a manifest use the plain file.
+async function sankeyUrl(): Promise<string> {
+	const manifest = await fetch("/data/sankey_manifest.json", {
+		cache: "no-cache",
+	})
+		.then((r) => (r.ok ? r.json() : {}))
+		.catch(() => ({}));
+	return `/data/${manifest[SANKEY_FILE]?.file ?? SANKEY_FILE}`;
+}
+
 export function Sankey() {
 	const [data, setData] = useState<SankeyData | null>(null);
 
 	useEffect(() => {
-		fetch("/data/sankey_2024_compact.json")
+		sankeyUrl()
+			.then((url) => fetch(url))
 			.then((r) => r.json())
 			.then((d) => setData(d));
 	}, []);